@@ -0,0 +1,243 @@
+"""
+End-to-end benchmark for the support agent graph.
+
+Runs entirely offline against the mock abilities and writes a JSON report that
+can be diffed between releases:
+
+    python -m benchmarks.bench_agent --tickets 500 --seed 7 --out bench.json
+    python -m benchmarks.bench_agent --baseline bench.json   # compare against a previous run
+"""
+from typing import Dict, Any, List
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.synthetic import generate_tickets
+
+CONFIG_PATH = "src/config/agent_config.yaml"
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(samples)
+
+    def at(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1)]
+    return {"p50": at(50), "p95": at(95), "p99": at(99)}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS. It is a process-wide
+    # high-water mark, which is why every mode runs in its own interpreter.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def stage_latencies(metrics) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {
+            "calls": series.calls,
+            "p50": series.latency.percentile(50),
+            "p95": series.latency.percentile(95),
+            "p99": series.latency.percentile(99),
+        }
+        for name, series in sorted(metrics.stages.items())
+    }
+
+
+def make_agent(agent_class, metrics, use_cache: bool, **kwargs):
+    agent = agent_class(CONFIG_PATH, metrics=metrics, **kwargs)
+    if not use_cache:
+        # Results must reflect stage work, not a warm cache left over from a previous run
+        agent.mcp_client.caches = {}
+    return agent
+
+
+def cold_start_probe() -> Dict[str, float]:
+    """Runs in a fresh interpreter: import, construct and run one ticket."""
+    started = time.perf_counter()
+    from src import LangGraphAgent, configure_logging
+    configure_logging("quiet")
+    imported = time.perf_counter()
+    agent = LangGraphAgent(CONFIG_PATH)
+    constructed = time.perf_counter()
+    agent.run(next(generate_tickets(1, seed=0)))
+    finished = time.perf_counter()
+    return {
+        "import_seconds": imported - started,
+        "construct_seconds": constructed - imported,
+        "startup_seconds": constructed - started,
+        "first_ticket_seconds": finished - constructed,
+        "total_seconds": finished - started,
+    }
+
+
+def bench_cold_start(repeats: int) -> Dict[str, Any]:
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_agent", "--cold-start-probe"],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: min(run[key] for run in runs) for key in runs[0]}
+
+
+def bench_warm_single(tickets: List[Dict[str, Any]], use_cache: bool) -> Dict[str, Any]:
+    from src.agent import LangGraphAgent
+    from src.metrics import Metrics
+    metrics = Metrics()
+    agent = make_agent(LangGraphAgent, metrics, use_cache)
+    agent.run(dict(tickets[0]))  # warm-up, not measured
+    metrics.stages.clear()
+    metrics.abilities.clear()
+
+    latencies = []
+    started = time.perf_counter()
+    for ticket in tickets:
+        ticket_started = time.perf_counter()
+        agent.run(dict(ticket))
+        latencies.append(time.perf_counter() - ticket_started)
+    elapsed = time.perf_counter() - started
+    return {
+        "tickets_per_sec": round(len(tickets) / elapsed, 2),
+        "latency_seconds": percentiles(latencies),
+        "stages": stage_latencies(metrics),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_batch(tickets: List[Dict[str, Any]], use_cache: bool, workers: int) -> Dict[str, Any]:
+    from src.agent import LangGraphAgent
+    from src.metrics import Metrics
+    metrics = Metrics()
+    agent = make_agent(LangGraphAgent, metrics, use_cache)
+    started = time.perf_counter()
+    results = agent.run_batch((dict(ticket) for ticket in tickets), max_workers=workers)
+    elapsed = time.perf_counter() - started
+    return {
+        "workers": workers,
+        "tickets_per_sec": round(len(results) / elapsed, 2),
+        "escalated": sum(bool(state.get("escalation_required")) for state in results),
+        "stages": stage_latencies(metrics),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_concurrent(tickets: List[Dict[str, Any]], use_cache: bool, concurrency: int) -> Dict[str, Any]:
+    from src.async_agent import AsyncLangGraphAgent
+    from src.metrics import Metrics
+    metrics = Metrics()
+    agent = make_agent(AsyncLangGraphAgent, metrics, use_cache, max_concurrency=concurrency)
+    started = time.perf_counter()
+    results = asyncio.run(agent.arun_batch([dict(ticket) for ticket in tickets]))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "tickets_per_sec": round(len(results) / elapsed, 2),
+        "stages": stage_latencies(metrics),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_isolated(mode: str) -> Dict[str, Any]:
+    """Runs one mode in a fresh interpreter, so its peak RSS is not inflated by earlier modes."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_agent", *sys.argv[1:], "--mode-probe", mode],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Prints throughput changes relative to a previous report."""
+    print(f"{'mode':<14}{'baseline':>12}{'current':>12}{'change':>10}")
+    for mode, result in report["modes"].items():
+        before = baseline.get("modes", {}).get(mode, {}).get("tickets_per_sec")
+        after = result.get("tickets_per_sec")
+        if before and after:
+            print(f"{mode:<14}{before:>12}{after:>12}{(after / before - 1) * 100:>9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the support agent graph on synthetic tickets.")
+    parser.add_argument("--tickets", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--min-words", type=int, default=8)
+    parser.add_argument("--max-words", type=int, default=60)
+    parser.add_argument("--keyword-density", type=float, default=0.08)
+    parser.add_argument("--short-query-ratio", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=4, help="Threads for the batch mode")
+    parser.add_argument("--concurrency", type=int, default=64, help="In-flight tickets for the async mode")
+    parser.add_argument("--cold-starts", type=int, default=3, help="Fresh interpreters to sample for cold start")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the ability caches from the config enabled")
+    parser.add_argument("--out", default="bench_output.json")
+    parser.add_argument("--baseline", help="Previous report to compare throughput against")
+    parser.add_argument("--startup-budget", type=float, default=2.0, metavar="SECONDS",
+                        help="Exit non-zero if import + agent construction in a fresh interpreter exceeds this "
+                             "(default: %(default)s; 0 disables the check)")
+    parser.add_argument("--cold-start-probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode-probe", choices=["warm_single", "batch", "concurrent"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_probe:
+        print(json.dumps(cold_start_probe()))
+        return
+
+    from src.tracing import configure_logging
+    configure_logging("quiet")
+
+    if args.mode_probe:
+        tickets = list(generate_tickets(
+            args.tickets, seed=args.seed, min_words=args.min_words, max_words=args.max_words,
+            keyword_density=args.keyword_density, short_query_ratio=args.short_query_ratio,
+        ))
+        if args.mode_probe == "warm_single":
+            result = bench_warm_single(tickets, args.with_cache)
+        elif args.mode_probe == "batch":
+            result = bench_batch(tickets, args.with_cache, args.workers)
+        else:
+            result = bench_concurrent(tickets, args.with_cache, args.concurrency)
+        print(json.dumps(result))
+        return
+
+    report = {
+        "meta": {
+            "tickets": args.tickets,
+            "seed": args.seed,
+            "keyword_density": args.keyword_density,
+            "short_query_ratio": args.short_query_ratio,
+            "ability_cache": args.with_cache,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "modes": {},
+    }
+    report["modes"]["cold_start"] = bench_cold_start(args.cold_starts)
+    for mode in ("warm_single", "batch", "concurrent"):
+        report["modes"][mode] = bench_isolated(mode)
+
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {args.out}")
+    for mode, result in report["modes"].items():
+        summary = result.get("tickets_per_sec", result.get("total_seconds"))
+        print(f"  {mode}: {summary}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            compare(report, json.load(file))
+
+    startup = report["modes"]["cold_start"]["startup_seconds"]
+    if args.startup_budget and startup > args.startup_budget:
+        sys.exit(f"Startup took {startup:.3f}s, over the {args.startup_budget:.3f}s budget")
+
+
+if __name__ == "__main__":
+    main()
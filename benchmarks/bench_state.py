@@ -0,0 +1,66 @@
+"""
+Memory held per finished ticket with the `dict` and `compact` state backends:
+
+    python -m benchmarks.bench_state --tickets 500
+
+Only the returned final states are retained and measured; checkpointed (parked)
+and in-flight states are plain dicts under both backends and are not counted.
+"""
+from typing import Dict, Any, List
+import argparse
+import gc
+import json
+import tracemalloc
+
+from benchmarks.synthetic import generate_tickets
+
+CONFIG_PATH = "src/config/agent_config.yaml"
+
+
+def bytes_per_ticket(agent, lines: List[str]) -> float:
+    """Traced bytes still allocated per ticket while all returned final states are held."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # Parse inside the traced region, as a JSONL reader would
+        results = [agent.run(json.loads(line)) for line in lines]
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del results
+    return round(current / len(lines), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-ticket memory of the state backends.")
+    parser.add_argument("--tickets", type=int, default=500, help="Traced runs are slow; the per-ticket figure is stable")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    from src.agent import LangGraphAgent
+    from src.tracing import configure_logging
+    configure_logging("quiet")
+
+    lines = [json.dumps(ticket, default=str) for ticket in generate_tickets(args.tickets, seed=args.seed)]
+    report: Dict[str, Any] = {"tickets": args.tickets, "bytes_per_ticket": {}}
+    for backend in ("dict", "compact"):
+        agent = LangGraphAgent(CONFIG_PATH)
+        agent.mcp_client.caches = {}
+        agent.compact_state = backend == "compact"
+        # Warm the KB query cache and shared tables so only per-ticket memory is traced
+        for line in lines:
+            agent.run(json.loads(line))
+        report["bytes_per_ticket"][backend] = bytes_per_ticket(agent, lines)
+
+    before, after = report["bytes_per_ticket"]["dict"], report["bytes_per_ticket"]["compact"]
+    report["reduction"] = round(1 - after / before, 3)
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
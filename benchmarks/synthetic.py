@@ -0,0 +1,51 @@
+from typing import Dict, Any, Iterator, Optional
+import random
+
+from src.keyword_scanner import DEFAULT_VOCABULARIES
+
+FILLER_WORDS = (
+    "i have been trying to use the dashboard since yesterday and it keeps showing a blank page "
+    "when i open my settings the export option is missing please let me know what to do next "
+    "our team needs access to the report before the meeting we already cleared the cache and "
+    "signed out and back in but nothing changed could you check my account configuration thanks"
+).split()
+
+SHORT_QUERIES = ["help?", "not working", "login issue", "why?", "refund please", "it broke"]
+
+DEFAULT_PRIORITY_MIX = {"low": 0.4, "medium": 0.3, "high": 0.2, "critical": 0.1}
+
+
+def generate_tickets(count: int, seed: int = 0, min_words: int = 8, max_words: int = 60,
+                     priority_mix: Optional[Dict[str, float]] = None, keyword_density: float = 0.08,
+                     short_query_ratio: float = 0.1) -> Iterator[Dict[str, Any]]:
+    """
+    Yields `count` reproducible synthetic tickets.
+
+    - Query length is drawn uniformly from [min_words, max_words] words.
+    - `priority_mix` maps priorities to relative weights.
+    - `keyword_density` is the chance that any word is a technical or urgency
+      term, which lowers the solution score and drives the escalate branch.
+    - `short_query_ratio` of tickets get a query under 20 characters, which
+      sends them down the ASK -> WAIT branch.
+    """
+    rng = random.Random(seed)
+    mix = priority_mix or DEFAULT_PRIORITY_MIX
+    priorities, weights = list(mix), list(mix.values())
+    keywords = DEFAULT_VOCABULARIES["technical"] + DEFAULT_VOCABULARIES["urgency"]
+
+    for i in range(count):
+        if rng.random() < short_query_ratio:
+            query = rng.choice(SHORT_QUERIES)
+        else:
+            words = [
+                rng.choice(keywords) if rng.random() < keyword_density else rng.choice(FILLER_WORDS)
+                for _ in range(rng.randint(min_words, max_words))
+            ]
+            query = " ".join(words).capitalize() + "."
+        yield {
+            "customer_name": f"Customer {i}",
+            "email": f"customer{i}@{'premium.' if rng.random() < 0.2 else ''}example.com",
+            "query": query,
+            "priority": rng.choices(priorities, weights)[0],
+            "ticket_id": f"BENCH-{seed}-{i}",
+        }
@@ -1,18 +1,24 @@
 from src.agent import LangGraphAgent
+from src.config_loader import load_config
+from src.ingestion import JsonlSink, ingest, open_source
+from src.metrics import Metrics
+from src.tracing import configure_logging
 from src.state import Priority
+from src.ticket_io import read_jsonl, write_jsonl
+from src.worker_pool import WorkerPool
+import argparse
 import json
 
 
-def run_example(example_name, input_data):
+def run_example(agent, example_name, input_data):
     print(f"\n{'=' * 50}")
     print(f"RUNNING EXAMPLE: {example_name}")
     print(f"{'=' * 50}")
 
-    agent = LangGraphAgent("src/config/agent_config.yaml")
     final_state = agent.run(input_data)
 
     print(f"\n=== {example_name} - FINAL PAYLOAD ===")
-    print(json.dumps(final_state, indent=2, default=str))
+    print(json.dumps(dict(final_state), indent=2, default=str))
 
     # Check if escalation occurred
     escalation = final_state.get("escalation_required", False)
@@ -21,7 +27,97 @@ def run_example(example_name, input_data):
     return final_state
 
 
+def run_file(agent, input_path, output_path, workers):
+    """Streams every ticket in a JSONL file through a single agent instance."""
+    results = agent.run_stream(read_jsonl(input_path), max_workers=workers)
+    count = write_jsonl(output_path, results)
+    print(f"\nProcessed {count} tickets from {input_path} -> {output_path}")
+
+
+def run_file_multiprocess(input_path, output_path, processes):
+    """Shards a JSONL file across worker processes, one compiled graph per process."""
+    with WorkerPool(processes, "src/config/agent_config.yaml") as pool:
+        count = write_jsonl(output_path, pool.run_stream(read_jsonl(input_path), ordered=True))
+        stats = pool.stats()
+    print(f"\nProcessed {count} tickets from {input_path} -> {output_path}")
+    for worker in stats:
+        print(f"  worker {worker['worker']}: {worker['processed']} tickets, "
+              f"{worker['tickets_per_sec']} tickets/sec, {worker['errors']} errors")
+
+
+def run_ingest(agent, config, source_spec, output_path, workers, processes, follow, rejects_path):
+    """Streams tickets from a JSONL file, stdin or a queue into `output_path` with at-least-once delivery."""
+    settings = config.get('ingestion')
+    source = open_source(source_spec, settings, follow=follow)
+    sink = JsonlSink(output_path)
+    rejects = JsonlSink(rejects_path) if rejects_path else None
+    try:
+        if processes:
+            with WorkerPool(processes, "src/config/agent_config.yaml") as pool:
+                stats = ingest(pool, source, sink, config.get('input_schema', []), settings, rejects)
+        else:
+            stats = ingest(agent, source, sink, config.get('input_schema', []), settings, rejects,
+                           max_workers=workers)
+    finally:
+        source.close()
+        sink.close()
+        if rejects is not None:
+            rejects.close()
+    print(f"\nIngested from {source_spec} -> {output_path}: {stats['completed']} completed, "
+          f"{stats['parked']} parked, {stats['rejected']} rejected, {stats['failed']} failed, "
+          f"{stats['duplicates']} already done")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Run the LangGraph customer support agent.")
+    parser.add_argument("tickets", nargs="?", help="JSONL file with one ticket per line (default: run the examples)")
+    parser.add_argument("--output", default="results.jsonl", help="Where to write final states for a JSONL run")
+    parser.add_argument("--workers", type=int, default=1, help="Number of tickets to process concurrently")
+    parser.add_argument("--processes", type=int, default=0, help="Shard a JSONL run across this many worker processes")
+    parser.add_argument("--metrics-out", help="Write stage/ability latency metrics here (.prom for Prometheus text, else JSON)")
+    parser.add_argument("--ingest", metavar="SOURCE",
+                        help="Stream tickets with at-least-once delivery from a JSONL file, '-' (stdin) or queue:PATH")
+    parser.add_argument("--follow", action="store_true", help="With --ingest queue:PATH, keep waiting for new tickets")
+    parser.add_argument("--rejects", help="With --ingest, write records that fail input_schema validation "
+                                          "or fail while running here")
+    parser.add_argument("--resume", metavar="TICKET_ID", help="Resume a ticket suspended in WAIT (needs checkpointing enabled)")
+    parser.add_argument("--answer", help="The customer's reply used with --resume")
+    parser.add_argument("--log-mode", choices=["console", "json", "quiet"], default="console",
+                        help="Trace output: human-readable console, buffered JSON lines, or nothing")
+    parser.add_argument("--log-file", help="With --log-mode json, append trace events here instead of stdout")
+    args = parser.parse_args()
+    configure_logging(args.log_mode, path=args.log_file)
+
+    if args.tickets and args.processes:
+        run_file_multiprocess(args.tickets, args.output, args.processes)
+        return
+
+    if args.ingest and args.processes:
+        run_ingest(None, load_config("src/config/agent_config.yaml")[0], args.ingest, args.output,
+                   args.workers, args.processes, args.follow, args.rejects)
+        return
+
+    # Parse the config and compile the graph once, then reuse them for every ticket
+    metrics = Metrics() if args.metrics_out else None
+    agent = LangGraphAgent("src/config/agent_config.yaml", metrics=metrics)
+
+    if args.resume:
+        final_state = agent.resume(args.resume, args.answer or "")
+        print(json.dumps(dict(final_state), indent=2, default=str))
+        return
+
+    if args.ingest:
+        run_ingest(agent, agent.config, args.ingest, args.output, args.workers, 0, args.follow, args.rejects)
+        if metrics:
+            metrics.write(args.metrics_out)
+        return
+
+    if args.tickets:
+        run_file(agent, args.tickets, args.output, args.workers)
+        if metrics:
+            metrics.write(args.metrics_out)
+        return
+
     # Example 1: Should ask clarification and escalate (short query with question)
     example1_input = {
         "customer_name": "John Doe",
@@ -42,8 +138,8 @@ def main():
     }
 
     # Run both examples
-    result1 = run_example("Example 1", example1_input)
-    result2 = run_example("Example 2", example2_input)
+    result1 = run_example(agent, "Example 1", example1_input)
+    result2 = run_example(agent, "Example 2", example2_input)
 
     # Summary
     print(f"\n{'=' * 50}")
@@ -52,6 +148,9 @@ def main():
     print(f"Example 1 - Escalation: {result1.get('escalation_required')}")
     print(f"Example 2 - Escalation: {result2.get('escalation_required')}")
 
+    if metrics:
+        metrics.write(args.metrics_out)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
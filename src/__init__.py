@@ -0,0 +1,37 @@
+"""
+Customer support agent built on LangGraph.
+
+The public names below are imported lazily on first access, so `import src` (and
+tools that only need, say, the knowledge base or scoring) does not pay for
+importing LangGraph.
+"""
+import importlib
+
+_EXPORTS = {
+    "LangGraphAgent": ".agent",
+    "AsyncLangGraphAgent": ".async_agent",
+    "WorkerPool": ".worker_pool",
+    "MCPClient": ".mcp_client",
+    "Metrics": ".metrics",
+    "CompactState": ".compact_state",
+    "SupportState": ".state",
+    "Priority": ".state",
+    "configure_logging": ".tracing",
+    "read_jsonl": ".ticket_io",
+    "write_jsonl": ".ticket_io",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,15 +1,20 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from ..state import SupportState
+from ..tracing import logger
+from ..knowledge_base import KnowledgeBaseHandle, default_knowledge_base
+from ..keyword_scanner import KeywordScanner, keyword_hits
+from ..scoring import needs_escalation
 
-def extract_entities(state: SupportState) -> Dict[str, Any]:
+def extract_entities(state: SupportState, scanner: Optional[KeywordScanner] = None) -> Dict[str, Any]:
     """Identify product, account, dates"""
     # Mock entity extraction
+    hits = keyword_hits(state, scanner)
     entities = {
-        "products": ["ProductA"] if "product" in state["query"].lower() else [],
-        "account_mentioned": "account" in state["query"].lower(),
-        "dates": ["2024-01-20"] if "january" in state["query"].lower() else []
+        "products": ["ProductA"] if hits.get("product") else [],
+        "account_mentioned": bool(hits.get("account")),
+        "dates": ["2024-01-20"] if hits.get("january") else []
     }
-    print("✓ extract_entities executed (ATLAS)")
+    logger.info("✓ extract_entities executed (ATLAS)")
     return {"extracted_entities": entities}
 
 def enrich_records(state: SupportState) -> Dict[str, Any]:
@@ -19,46 +24,73 @@ def enrich_records(state: SupportState) -> Dict[str, Any]:
         "previous_tickets": 2,
         "customer_tier": "premium" if "premium" in state["email"] else "standard"
     }
-    print("✓ enrich_records executed (ATLAS)")
+    logger.info("✓ enrich_records executed (ATLAS)")
     return {"enriched_data": enriched_data}
 
+def enrich_records_batch(states: List[SupportState]) -> List[Dict[str, Any]]:
+    """Bulk variant of enrich_records: one CRM lookup for every ticket in the batch"""
+    tiers = {email: "premium" if "premium" in email else "standard" for email in {s["email"] for s in states}}
+    results = [
+        {"enriched_data": {
+            "sla_due_date": "2024-01-17T23:59:59Z",
+            "previous_tickets": 2,
+            "customer_tier": tiers[state["email"]]
+        }}
+        for state in states
+    ]
+    logger.info("✓ enrich_records executed for %s tickets (ATLAS)", len(states))
+    return results
+
 def clarify_question(state: SupportState) -> Dict[str, Any]:
     """Request missing information"""
     question = "Can you please provide more details about the issue you're experiencing?"
-    print("✓ clarify_question executed (ATLAS)")
+    logger.info("✓ clarify_question executed (ATLAS)")
     return {"clarification_question": question}
 
 def extract_answer(state: SupportState) -> Dict[str, Any]:
     """Wait and capture concise response"""
-    # Simulate waiting for and extracting answer
-    answer = "The issue occurs when I click the submit button twice."
-    print("✓ extract_answer executed (ATLAS)")
+    # Use the customer's reply if the ticket was resumed with one, otherwise simulate it
+    answer = state.get("clarification_answer") or "The issue occurs when I click the submit button twice."
+    logger.info("✓ extract_answer executed (ATLAS)")
     return {"clarification_answer": answer}
 
-def knowledge_base_search(state: SupportState) -> Dict[str, Any]:
+def knowledge_base_search(state: SupportState, knowledge_base: Optional[KnowledgeBaseHandle] = None) -> Dict[str, Any]:
     """Lookup KB or FAQ"""
-    kb_results = [
-        {"title": "How to resolve submission issues", "url": "https://kb.example.com/123"},
-        {"title": "Common product errors", "url": "https://kb.example.com/456"}
-    ]
-    print("✓ knowledge_base_search executed (ATLAS)")
+    knowledge_base = knowledge_base or default_knowledge_base()
+    kb_results = knowledge_base.get().search(state["query"], top_k=knowledge_base.top_k)
+    logger.info("✓ knowledge_base_search executed - %s results (ATLAS)", len(kb_results))
     return {"kb_results": kb_results}
 
-def escalation_decision(state: SupportState) -> Dict[str, Any]:
-    """Assign to human agent if score <90"""
-    escalation_required = state.get("solution_score", 0) < 90
-    print(f"✓ escalation_decision executed - Escalation: {escalation_required} (ATLAS)")
+def knowledge_base_search_batch(states: List[SupportState],
+                                knowledge_base: Optional[KnowledgeBaseHandle] = None) -> List[Dict[str, Any]]:
+    """Bulk variant of knowledge_base_search: repeated queries are searched once"""
+    knowledge_base = knowledge_base or default_knowledge_base()
+    results = knowledge_base.get().search_many([state["query"] for state in states], top_k=knowledge_base.top_k)
+    logger.info("✓ knowledge_base_search executed for %s tickets (ATLAS)", len(states))
+    return [{"kb_results": kb_results} for kb_results in results]
+
+def escalation_decision(state: SupportState, weights: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Assign to human agent if score is below the escalation threshold (90 by default)"""
+    escalation_required = needs_escalation(state.get("solution_score", 0), weights)
+    logger.info("✓ escalation_decision executed - Escalation: %s (ATLAS)", escalation_required)
     return {"escalation_required": escalation_required}
 
 def update_ticket(state: SupportState) -> Dict[str, Any]:
     """Modify status, fields, priority"""
     status = "escalated" if state.get("escalation_required") else "in_progress"
-    print(f"✓ update_ticket executed - Status: {status} (ATLAS)")
+    logger.info("✓ update_ticket executed - Status: %s (ATLAS)", status)
     return {"ticket_status": status}
 
+def update_ticket_batch(states: List[SupportState]) -> List[Dict[str, Any]]:
+    """Bulk variant of update_ticket: one CRM write for every ticket in the batch"""
+    results = [{"ticket_status": "escalated" if state.get("escalation_required") else "in_progress"}
+               for state in states]
+    logger.info("✓ update_ticket executed for %s tickets (ATLAS)", len(states))
+    return results
+
 def close_ticket(state: SupportState) -> Dict[str, Any]:
     """Mark issue resolved"""
-    print("✓ close_ticket executed (ATLAS)")
+    logger.info("✓ close_ticket executed (ATLAS)")
     return {"ticket_status": "closed"}
 
 def execute_api_calls(state: SupportState) -> Dict[str, Any]:
@@ -67,10 +99,15 @@ def execute_api_calls(state: SupportState) -> Dict[str, Any]:
         "crm_update": "success",
         "timestamp": "2024-01-15T11:30:00Z"
     }
-    print("✓ execute_api_calls executed (ATLAS)")
+    logger.info("✓ execute_api_calls executed (ATLAS)")
     return {"api_call_results": api_results}
 
 def trigger_notifications(state: SupportState) -> Dict[str, Any]:
     """Notify customer"""
-    print("✓ trigger_notifications executed (ATLAS)")
-    return {"notifications_sent": True}
\ No newline at end of file
+    logger.info("✓ trigger_notifications executed (ATLAS)")
+    return {"notifications_sent": True}
+
+def trigger_notifications_batch(states: List[SupportState]) -> List[Dict[str, Any]]:
+    """Bulk variant of trigger_notifications: one send for every ticket in the batch"""
+    logger.info("✓ trigger_notifications executed for %s tickets (ATLAS)", len(states))
+    return [{"notifications_sent": True} for _ in states]
@@ -1,17 +1,37 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from ..state import SupportState
+from ..tracing import logger
+from ..keyword_scanner import KeywordScanner, get_scanner, keyword_hits
+from ..scoring import score_query
+from ..dedup import REUSED_FIELDS, NearDuplicateIndex
+from ..templates import ResponseTemplates, get_response_templates
 
 
-def parse_request_text(state: SupportState) -> Dict[str, Any]:
+def scan_keywords(state: SupportState, scanner: Optional[KeywordScanner] = None) -> Dict[str, Any]:
+    """Match every configured vocabulary against the query in one pass"""
+    hits = (scanner or get_scanner()).scan(state["query"])
+    logger.info("✓ scan_keywords executed (COMMON)")
+    return {"keyword_hits": hits}
+
+
+def remember_resolution(state: SupportState, dedup_index: Optional[NearDuplicateIndex] = None) -> Dict[str, Any]:
+    """Record the ticket's decision so near-duplicates can reuse it"""
+    if dedup_index is not None:
+        dedup_index.add(str(state["ticket_id"]), state["query"], {field: state.get(field) for field in REUSED_FIELDS})
+        logger.info("✓ remember_resolution executed (COMMON)")
+    return {}
+
+
+def parse_request_text(state: SupportState, scanner: Optional[KeywordScanner] = None) -> Dict[str, Any]:
     """Convert unstructured request to structured data"""
     # Simple implementation - in real scenario would use NLP
+    scanner = scanner or get_scanner()
+    urgency_words = scanner.vocabularies.get("request_urgency", [])
     structured_data = {
         "customer_query": state["query"],
-        "urgency_keywords": ["urgent", "asap", "immediately"] if any(
-            word in state["query"].lower() for word in ["urgent", "asap", "immediately"]
-        ) else []
+        "urgency_keywords": list(urgency_words) if keyword_hits(state, scanner).get("request_urgency") else []
     }
-    print("✓ parse_request_text executed (COMMON)")
+    logger.info("✓ parse_request_text executed (COMMON)")
     return {"structured_data": structured_data}
 
 
@@ -22,63 +42,49 @@ def normalize_fields(state: SupportState) -> Dict[str, Any]:
         "ticket_id": f"TKT-{state['ticket_id']}",
         "received_timestamp": "2024-01-15T10:30:00Z"  # Would use current time in real scenario
     }
-    print("✓ normalize_fields executed (COMMON)")
+    logger.info("✓ normalize_fields executed (COMMON)")
     return {"normalized_fields": normalized_data}
 
 
-def add_flags_calculations(state: SupportState) -> Dict[str, Any]:
+def add_flags_calculations(state: SupportState, scanner: Optional[KeywordScanner] = None) -> Dict[str, Any]:
     """Compute priority or SLA risk"""
     flags = {
         "high_priority": state["priority"] in ["high", "critical"],
         "sla_risk": state["priority"] == "critical",
-        "requires_follow_up": "follow up" in state["query"].lower()
+        "requires_follow_up": bool(keyword_hits(state, scanner).get("follow_up"))
     }
-    print("✓ add_flags_calculations executed (COMMON)")
+    logger.info("✓ add_flags_calculations executed (COMMON)")
     return {"flags": flags}
 
 
-def solution_evaluation(state: SupportState) -> Dict[str, Any]:
+def solution_evaluation(state: SupportState, scanner: Optional[KeywordScanner] = None,
+                        weights: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Score potential solutions 1-100 based on query complexity"""
-    query = state["query"].lower()
-
-    # More sophisticated scoring based on various factors
-    score = 100  # Start with perfect score
-
-    # Deduct points based on length
-    if len(query) < 20:  # Very short query
-        score -= 40
-    elif len(query) < 50:  # Short query
-        score -= 20
-    elif len(query) > 100:  # Long query might be complex
-        score -= 10
-
-    # Deduct points for technical complexity indicators
-    technical_terms = ["error", "bug", "crash", "failure", "timeout", "database", "server", "production"]
-    technical_count = sum(1 for term in technical_terms if term in query)
-    score -= technical_count * 5
-
-    # Deduct points for urgency indicators
-    urgency_terms = ["urgent", "critical", "immediately", "asap", "emergency"]
-    urgency_count = sum(1 for term in urgency_terms if term in query)
-    score -= urgency_count * 3
-
-    # Ensure score is within bounds
-    score = max(50, min(100, score))
-
-    print(f"✓ solution_evaluation executed - Score: {score}/100 (COMMON)")
+    hits = keyword_hits(state, scanner)
+
+    # Shorter (vaguer) and longer (more complex) queries score lower, as do
+    # technical and urgency terms; weights come from the `scoring` config
+    score = score_query(
+        len(state["query"]),
+        technical_count=len(hits.get("technical", [])),
+        urgency_count=len(hits.get("urgency", [])),
+        weights=weights,
+    )
+
+    logger.info("✓ solution_evaluation executed - Score: %s/100 (COMMON)", score)
     return {"solution_score": score}
 
 
-def response_generation(state: SupportState) -> Dict[str, Any]:
+def response_generation(state: SupportState, templates: Optional[ResponseTemplates] = None) -> Dict[str, Any]:
     """Draft customer reply"""
-    response = f"""Dear {state['customer_name']},
-
-Thank you for contacting support. We have {'escalated' if state.get('escalation_required') else 'processed'} your request.
+    response = (templates or get_response_templates()).render(state)
+    logger.info("✓ response_generation executed (COMMON)")
+    return {"response": response}
 
-Query: {state['query'][:100]}...
-{'Your issue has been assigned to a specialist for further investigation.' if state.get('escalation_required') else 'Your issue has been resolved.'}
 
-Best regards,
-Support Team"""
-    print("✓ response_generation executed (COMMON)")
-    return {"response": response}
\ No newline at end of file
+def response_generation_batch(states: List[SupportState],
+                              templates: Optional[ResponseTemplates] = None) -> List[Dict[str, Any]]:
+    """Draft replies for many tickets against one template snapshot"""
+    responses = (templates or get_response_templates()).render_many(states)
+    logger.info("✓ response_generation executed for %s tickets (COMMON)", len(states))
+    return [{"response": response} for response in responses]
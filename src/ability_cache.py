@@ -0,0 +1,231 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_MISSING = object()
+
+
+class SqliteCacheStore:
+    """
+    On-disk cache backend shared by every ability (and every process pointing at
+    the same file), so entries survive restarts. Expired rows are deleted when the
+    store is opened and then at most every `purge_interval` seconds on `put`.
+    """
+
+    def __init__(self, path: str, purge_interval: float = 60.0):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS ability_cache (
+                    ability TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (ability, key)
+                );
+                """
+            )
+            self._purge(time.time())
+
+    def get(self, ability: str, key: str) -> Tuple[Any, Optional[float]]:
+        """Returns (value, expires_at as a time.time() timestamp or None), or (_MISSING, None)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM ability_cache WHERE ability = ? AND key = ?", (ability, key)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return _MISSING, None
+        return json.loads(row[0]), row[1]
+
+    def put(self, ability: str, key: str, value: Any, ttl: Optional[float]) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ability_cache (ability, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (ability, key, json.dumps(value, default=str), expires_at),
+            )
+            if now >= self._next_purge:
+                self._purge(now)
+            self._conn.commit()
+
+    def _purge(self, now: float) -> None:
+        # Callers hold self._lock
+        self._conn.execute("DELETE FROM ability_cache WHERE expires_at < ?", (now,))
+        self._conn.commit()
+        self._next_purge = now + self.purge_interval
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class AbilityCache:
+    """
+    Memoizes one ability's result on the state fields it declares it depends on.
+
+    Entries expire after `ttl` seconds (if set) and the in-memory table is bounded
+    to `max_size` entries, evicting the least recently (`lru`) or least frequently
+    (`lfu`) used one. With a `store`, misses fall through to the shared on-disk
+    backend and new results are written to it.
+    """
+
+    def __init__(self, ability: str, key_fields: List[str], ttl: Optional[float] = None,
+                 max_size: int = 1024, policy: str = "lru", store: Optional[SqliteCacheStore] = None):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown cache policy: {policy}")
+        self.ability = ability
+        self.key_fields = list(key_fields)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.policy = policy
+        self.store = store
+
+        self._lock = threading.Lock()
+        # key -> [value, expires_at, frequency]
+        self._entries: Dict[str, list] = {}
+        # LRU: recency order; LFU: frequency -> keys in recency order
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+        self._by_frequency: Dict[int, "OrderedDict[str, None]"] = defaultdict(OrderedDict)
+        self._min_frequency = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, state: Dict[str, Any]) -> str:
+        return json.dumps([state.get(field) for field in self.key_fields], default=str)
+
+    def get(self, state: Dict[str, Any]) -> Tuple[bool, Any]:
+        """Returns (True, result) on a hit, (False, None) on a miss."""
+        key = self.key(state)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] is not None and entry[1] < time.monotonic():
+                    self._remove(key)
+                else:
+                    self._touch(key, entry)
+                    self.hits += 1
+                    return True, entry[0]
+
+        if self.store is not None:
+            value, expires_at = self.store.get(self.ability, key)
+            if value is not _MISSING:
+                with self._lock:
+                    self.disk_hits += 1
+                    # Another thread may have filled the key since the lookup above
+                    if key not in self._entries:
+                        # Keep the stored expiry rather than restarting the TTL
+                        remaining = None if expires_at is None else expires_at - time.time()
+                        self._insert(key, value, remaining)
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, state: Dict[str, Any], value: Any) -> None:
+        key = self.key(state)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._insert(key, value, self.ttl or None)
+        if self.store is not None:
+            self.store.put(self.ability, key, value, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    # --- internals; callers hold self._lock ---
+
+    def _insert(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        if len(self._entries) >= self.max_size:
+            self._evict()
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = [value, expires_at, 1]
+        if self.policy == "lru":
+            self._order[key] = None
+        else:
+            self._by_frequency[1][key] = None
+            self._min_frequency = 1
+
+    def _touch(self, key: str, entry: list) -> None:
+        if self.policy == "lru":
+            self._order.move_to_end(key)
+            return
+        frequency = entry[2]
+        bucket = self._by_frequency[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._by_frequency[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+        entry[2] = frequency + 1
+        self._by_frequency[frequency + 1][key] = None
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        if self.policy == "lru":
+            del self._order[key]
+            return
+        bucket = self._by_frequency[entry[2]]
+        del bucket[key]
+        if not bucket:
+            del self._by_frequency[entry[2]]
+            if self._by_frequency:
+                self._min_frequency = min(self._by_frequency)
+
+    def _evict(self) -> None:
+        if self.policy == "lru":
+            key = next(iter(self._order))
+        else:
+            key = next(iter(self._by_frequency[self._min_frequency]))
+        self._remove(key)
+        self.evictions += 1
+
+
+def build_ability_caches(config: Dict[str, Any], base_dir: str = ".") -> Dict[str, AbilityCache]:
+    """
+    Creates a cache for every ability that declares a `cache` block in the stage
+    config. Abilities marked `shared: true` also use the on-disk store configured
+    under `ability_cache.disk_path` (relative to `base_dir`).
+    """
+    settings = config.get('ability_cache') or {}
+    store = None
+    caches: Dict[str, AbilityCache] = {}
+    for stage in config.get('stages', {}).values():
+        for ability in stage.get('abilities', []):
+            options = ability.get('cache')
+            if not options or ability['name'] in caches:
+                continue
+            if options.get('shared') and settings.get('disk_path') and store is None:
+                store = SqliteCacheStore(os.path.join(base_dir, settings['disk_path']))
+            caches[ability['name']] = AbilityCache(
+                ability['name'],
+                options['key'],
+                ttl=options.get('ttl'),
+                max_size=options.get('max_size', 1024),
+                policy=options.get('policy', 'lru'),
+                store=store if options.get('shared') else None,
+            )
+    return caches
@@ -1,10 +1,43 @@
-from typing import Dict, Any, List, Literal
-from langgraph.graph import StateGraph, END
+from typing import TYPE_CHECKING, Callable, Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from .state import SupportState
-from .mcp_client import MCPClient
-import yaml
+from .mcp_client import BoundAbility, MCPClient
+from .ability_cache import build_ability_caches
+from .config_loader import compile_condition, load_config
+from .compact_state import CompactState
+from .dedup import build_dedup_index, fast_path_stages
+from .metrics import instrument_stage
+from .knowledge_base import KnowledgeBaseHandle
+from .keyword_scanner import DEFAULT_VOCABULARIES, KeywordScanner
+from .scoring import DEFAULT_SCORING
+from .templates import ResponseTemplates
+from .tracing import bind, logger
+import contextvars
 import os
 
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
+
+# A compiled ability call: (bound ability, `when` predicate or None, log, skip_log)
+Step = Tuple[BoundAbility, Optional[Callable[[Dict[str, Any]], bool]], Optional[str], Optional[str]]
+
+
+class _StateFields:
+    """Lets route messages name state fields that are not set yet; they render as None."""
+    __slots__ = ("state",)
+
+    def __init__(self, state: Dict[str, Any]):
+        self.state = state
+
+    def __getitem__(self, key: str) -> Any:
+        return self.state.get(key)
+
+
+def failed_state(ticket: Dict[str, Any], error: BaseException) -> Dict[str, Any]:
+    """The result reported for a ticket whose run raised, so a stream can carry on past it."""
+    return {**ticket, "ticket_status": "failed", "error": f"{type(error).__name__}: {error}"}
+
 
 class LangGraphAgent:
     """
@@ -14,210 +47,337 @@ class LangGraphAgent:
     scenarios like escalation.
     """
 
-    def __init__(self, config_path: str = "src/config/agent_config.yaml"):
-        """Initializes the agent, loading configuration and building the graph."""
-        self.mcp_client = MCPClient()
-        self.config = self.load_config(config_path)
+    def __init__(self, config_path: str = "src/config/agent_config.yaml", metrics=None):
+        """
+        Initializes the agent, loading configuration and building the graph.
+        `metrics` is an optional collector (see `src.metrics.Metrics`) that receives
+        per-stage and per-ability timings.
+        """
+        self.metrics = metrics
+        self.config, plan = load_config(config_path)
+        self.config_dir = os.path.dirname(config_path)
+        # Recently decided tickets that near-duplicates reuse; None when dedup is off
+        self.dedup_index = build_dedup_index(self.config.get('dedup'))
+        # Per-agent objects the in-process abilities are bound to, so agents with
+        # different configs in one process don't share (or overwrite) them
+        self.resources = {
+            "scanner": KeywordScanner(self.config.get('vocabularies') or DEFAULT_VOCABULARIES),
+            # Opened on the first search
+            "knowledge_base": KnowledgeBaseHandle(self.config.get('knowledge_base'), base_dir=self.config_dir),
+            "weights": {**DEFAULT_SCORING, **(self.config.get('scoring') or {})},
+            "templates": ResponseTemplates(self.config.get('responses'), config_path=config_path),
+            "dedup_index": self.dedup_index,
+        }
+        self.mcp_client = MCPClient(
+            metrics=metrics,
+            caches=build_ability_caches(self.config, self.config_dir),
+            servers=self.config.get('servers'),
+            batching=self.config.get('batching'),
+            resources=self.resources,
+        )
+        self.plan = plan
+        self.stages = self.compile_stages()
+        # Stages a near-duplicate still runs; stages compiled away as no-ops are dropped
+        self.fast_path = tuple(
+            self._node(stage_name, self.stages[stage_name])
+            for stage_name in fast_path_stages(self.config.get('dedup')) if stage_name in self.stages
+        )
+        # Shared pool for stages configured with `mode: parallel`; threads start lazily
+        self.ability_executor = ThreadPoolExecutor(thread_name_prefix="ability")
+        # `compact` returns finished tickets as read-only CompactState mappings
+        self.compact_state = self.config.get('state_backend', 'dict') == 'compact'
+        self.checkpoint_settings = self.config.get('checkpoint') or {}
+        self.checkpointer = self.make_checkpointer() if self.checkpoint_settings.get('enabled') else None
         self.graph = self.build_graph()
 
-    def load_config(self, config_path: str) -> Dict[str, Any]:
-        """Loads the agent's configuration from a YAML file."""
-        with open(config_path, 'r') as file:
-            return yaml.safe_load(file)
+    def checkpoint_path(self) -> str:
+        """Location of the checkpoint database, relative paths being relative to the config file."""
+        return os.path.join(self.config_dir, self.checkpoint_settings.get('path', 'checkpoints.sqlite'))
+
+    def make_checkpointer(self):
+        """
+        Creates the LangGraph checkpointer that persists each ticket's state at every
+        stage boundary, keyed by `ticket_id`.
+        """
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        path = self.checkpoint_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return SqliteSaver.from_conn_string(path)
 
-    def build_graph(self) -> StateGraph:
+    def build_graph(self) -> "StateGraph":
         """
         Builds the computational graph of the support workflow using StateGraph.
-        This defines all the stages (nodes) and the transitions (edges) between them.
+        Nodes, edges and conditional routes all come from the `stages` section of
+        the config; each node runs a stage compiled in `compile_stages`.
         """
+        # Imported here so that importing this module stays cheap
+        from langgraph.graph import StateGraph, END
         workflow = StateGraph(SupportState)
 
-        # Define all nodes that represent a stage in the workflow
-        workflow.add_node("INTAKE", self.intake_stage)
-        workflow.add_node("UNDERSTAND", self.understand_stage)
-        workflow.add_node("PREPARE", self.prepare_stage)
-        workflow.add_node("ASK", self.ask_stage)
-        workflow.add_node("WAIT", self.wait_stage)
-        workflow.add_node("RETRIEVE", self.retrieve_stage)
-        workflow.add_node("DECIDE", self.decide_stage)
-        workflow.add_node("UPDATE", self.update_stage)
-        workflow.add_node("CREATE", self.create_stage)
-        workflow.add_node("DO", self.do_stage)
-        workflow.add_node("COMPLETE", self.complete_stage)
-
-        # Set the entry point of the workflow
-        workflow.set_entry_point("INTAKE")
-
-        # Define the edges that connect the nodes, forming the workflow path
-        workflow.add_edge("INTAKE", "UNDERSTAND")
-        workflow.add_edge("UNDERSTAND", "PREPARE")
-
-        # After PREPARE, the graph must decide whether to ask for clarification
-        # or proceed directly to retrieving information.
-        workflow.add_conditional_edges(
-            "PREPARE",
-            self.should_ask_clarification,
-            {
-                "ask": "ASK",
-                "retrieve": "RETRIEVE"
-            }
-        )
+        for stage_name, stage in self.stages.items():
+            workflow.add_node(stage_name, self._node(stage_name, stage))
+        workflow.set_entry_point(self.plan["entry"])
 
-        # The 'ask for clarification' path involves asking and then waiting for a response
-        workflow.add_edge("ASK", "WAIT")
-        workflow.add_edge("WAIT", "RETRIEVE")
-
-        # After retrieving information, the agent decides on the next steps
-        workflow.add_edge("RETRIEVE", "DECIDE")
-
-        # After DECIDE, the graph must decide whether to escalate or resolve.
-        # This is the core non-deterministic step for escalation.
-        workflow.add_conditional_edges(
-            "DECIDE",
-            self.should_escalate,
-            {
-                # In both cases, we go to UPDATE. The 'escalation_required' flag in the
-                # state will determine the actual operations performed in later stages.
-                "escalate": "UPDATE",
-                "resolve": "UPDATE"
-            }
+        for stage_name, spec in self.plan["stages"].items():
+            routes = spec["routes"]
+            if len(routes) == 1 and routes[0][1] is None and not routes[0][2]:
+                target = routes[0][0]
+                workflow.add_edge(stage_name, END if target == "END" else target)
+                continue
+            # Routes are tried in order; the first whose condition holds wins
+            path_map = {str(index): END if target == "END" else target
+                        for index, (target, _, _) in enumerate(routes)}
+            path_map["END"] = END
+            workflow.add_conditional_edges(stage_name, self._router(routes), path_map)
+
+        # Compile the graph into a runnable object. With checkpointing enabled the run
+        # suspends before the configured stages (WAIT by default) and is picked up
+        # again by `resume` once the customer's answer arrives.
+        if self.checkpointer is None:
+            return workflow.compile()
+        return workflow.compile(
+            checkpointer=self.checkpointer,
+            interrupt_before=self.checkpoint_settings.get('suspend_before', ['WAIT']),
         )
 
-        # After updating the ticket, we generate a response and execute actions
-        workflow.add_edge("UPDATE", "CREATE")
-        workflow.add_edge("CREATE", "DO")
-        workflow.add_edge("DO", "COMPLETE")
-
-        # The final stage is COMPLETE, which then transitions to the end of the workflow
-        workflow.add_edge("COMPLETE", END)
-
-        # Compile the graph into a runnable object
-        return workflow.compile()
+    def _node(self, name: str, stage):
+        """Wraps a stage method with instrumentation when a metrics collector is set."""
+        return instrument_stage(self.metrics, name, stage)
 
-    def should_ask_clarification(self, state: SupportState) -> Literal["ask", "retrieve"]:
+    def _router(self, routes) -> Callable[[SupportState], str]:
         """
-        Decision node: Determines if the agent needs to ask the user for more information.
+        Decision node: picks the first route whose `when` holds, logging its message.
+        Falls through to the end of the workflow when no route matches.
         """
-        query = state.get("query", "")
-        # Simple logic: if the query is very short or contains a question, ask for clarification.
-        if len(query) < 20:
-            print("Decision: Clarification needed (query is short or contains a question).")
-            return "ask"
-        else:
-            print("Decision: No clarification needed.")
-            return "retrieve"
+        compiled = tuple((compile_condition(when), log) for _, when, log in routes)
+
+        def route(state: SupportState) -> str:
+            for index, (when, log) in enumerate(compiled):
+                if when is None or when(state):
+                    if log:
+                        logger.info(log.format_map(_StateFields(state)))
+                    return str(index)
+            return "END"
+        return route
+
+    def _begin_stage(self, stage: str, state: SupportState, banner: str) -> None:
+        """Tags subsequent log events with the ticket and stage, then logs the stage banner."""
+        bind(ticket_id=state.get("ticket_id"), stage=stage)
+        logger.info("\n=== %s ===", banner)
+
+    def _should_run(self, state: SupportState, when, log: Optional[str], skip_log: Optional[str]) -> bool:
+        """Evaluates a stage's or ability's `when`, logging `log` or `skip_log` accordingly."""
+        if when is not None and not when(state):
+            if skip_log:
+                logger.info(skip_log)
+            return False
+        if log:
+            logger.info(log)
+        return True
 
-    def should_escalate(self, state: SupportState) -> Literal["escalate", "resolve"]:
-        """
-        Decision node: Determines if the ticket needs to be escalated to a human agent.
-        The `escalation_required` flag is set during the 'DECIDE' stage.
-        """
-        escalation_required = state.get("escalation_required", False)
-        score = state.get("solution_score", 0)
+    # --- STAGE DEFINITIONS ---
 
-        if escalation_required:
-            print(f"Decision: ESCALATE (score: {score}). Ticket requires human intervention.")
-            return "escalate"
-        else:
-            print(f"Decision: RESOLVE (score: {score}). Ticket can be handled automatically.")
-            return "resolve"
+    def compile_stages(self) -> Dict[str, Callable]:
+        """Compiles every stage in the plan into a node function, binding its abilities once."""
+        return {stage_name: self._compile_stage(stage_name, spec) for stage_name, spec in self.plan["stages"].items()}
 
-    # --- STAGE DEFINITIONS ---
+    def _bind_steps(self, steps) -> Tuple[Step, ...]:
+        """Resolves a stage's abilities; unknown abilities fail here, not mid-ticket."""
+        return tuple(
+            (self.mcp_client.bind_ability(name, server), compile_condition(when), log, skip_log)
+            for name, server, when, log, skip_log in steps
+        )
+
+    def _compile_stage(self, stage_name: str, spec: Dict[str, Any]) -> Callable[[SupportState], Dict[str, Any]]:
+        banner, parallel = spec["banner"], spec["parallel"]
+        when, log, skip_log = compile_condition(spec["when"]), spec["log"], spec["skip_log"]
+        steps = self._bind_steps(spec["steps"])
+
+        def stage(state: SupportState) -> Dict[str, Any]:
+            self._begin_stage(stage_name, state, banner)
+            if not self._should_run(state, when, log, skip_log):
+                return {}
+            return self.execute_abilities(steps, state, parallel=parallel)
+        return stage
+
+    def execute_abilities(self, steps: Sequence[Step], state: SupportState,
+                          parallel: bool = False) -> Dict[str, Any]:
+        """
+        A helper function to run a stage's compiled (ability, when, log, skip_log) steps.
+
+        With `parallel=True` the abilities must not depend on each other's output:
+        they all read the same input state, run concurrently on the ability pool,
+        and their results are merged in the order they are listed in the config.
 
-    def intake_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 1: INTAKE ===")
-        print("✓ Payload accepted")
-        return state
-
-    def understand_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 2: UNDERSTAND ===")
-        abilities = self.config['stages']['UNDERSTAND']['abilities']
-        return self.execute_abilities(abilities, state)
-
-    def prepare_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 3: PREPARE ===")
-        abilities = self.config['stages']['PREPARE']['abilities']
-        return self.execute_abilities(abilities, state)
-
-    def ask_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 4: ASK ===")
-        abilities = self.config['stages']['ASK']['abilities']
-        return self.execute_abilities(abilities, state)
-
-    def wait_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 5: WAIT ===")
-        abilities = self.config['stages']['WAIT']['abilities']
-        return self.execute_abilities(abilities, state)
-
-    def retrieve_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 6: RETRIEVE ===")
-        abilities = self.config['stages']['RETRIEVE']['abilities']
-        return self.execute_abilities(abilities, state)
-
-    def decide_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 7: DECIDE (Non-deterministic) ===")
-        # This stage evaluates the query and makes a decision on whether to escalate.
-        # 1. Evaluate the solution to get a score.
-        state.update(self.mcp_client.execute_ability("solution_evaluation", state, "COMMON"))
-        # 2. Based on the score, decide if escalation is required.
-        state.update(self.mcp_client.execute_ability("escalation_decision", state, "ATLAS"))
-        return state
-
-    def update_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 8: UPDATE ===")
-        # This stage is now intelligent. It updates the ticket status differently
-        # depending on whether escalation is required.
-
-        # Always update the ticket status first.
-        state.update(self.mcp_client.execute_ability("update_ticket", state, "ATLAS"))
-
-        # Only close the ticket if it's NOT being escalated.
-        if not state.get("escalation_required", False):
-            print("Ticket is being resolved, proceeding to close.")
-            state.update(self.mcp_client.execute_ability("close_ticket", state, "ATLAS"))
-        else:
-            print("Ticket is being escalated, skipping ticket closure.")
-
-        return state
-
-    def create_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 9: CREATE ===")
-        # Generates the appropriate response for the customer, which will differ
-        # if the ticket is escalated or resolved.
-        abilities = self.config['stages']['CREATE']['abilities']
-        return self.execute_abilities(abilities, state)
-
-    def do_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 10: DO ===")
-        # This stage is also intelligent. It should only execute automated actions
-        # (like API calls) if the ticket has been successfully resolved.
-        if not state.get("escalation_required", False):
-            print("Executing automated actions for resolved ticket.")
-            abilities = self.config['stages']['DO']['abilities']
-            return self.execute_abilities(abilities, state)
-        else:
-            print("Skipping automated actions for escalated ticket.")
-            return state
-
-    def complete_stage(self, state: SupportState) -> Dict[str, Any]:
-        print("\n=== STAGE 11: COMPLETE ===")
-        print("✓ Workflow finished. Final payload generated.")
-        return state
-
-    def execute_abilities(self, abilities: List[Dict[str, str]], state: SupportState) -> Dict[str, Any]:
-        """A helper function to run a list of abilities for a given stage."""
-        for ability in abilities:
-            if ability['server'] == 'STATE':
+        Returns only the keys the abilities wrote; `state` is also updated so each
+        sequential ability sees the results of the ones before it.
+        """
+        if parallel and len(steps) > 1:
+            futures = [
+                self.ability_executor.submit(contextvars.copy_context().run, ability, state)
+                for ability, when, log, skip_log in steps
+                if (when is None and not log) or self._should_run(state, when, log, skip_log)
+            ]
+            changes = {}
+            for future in futures:
+                changes.update(future.result())
+            state.update(changes)
+            return changes
+
+        changes = {}
+        for ability, when, log, skip_log in steps:
+            if (when is not None or log) and not self._should_run(state, when, log, skip_log):
                 continue
-            result = self.mcp_client.execute_ability(
-                ability['name'], state, ability['server']
-            )
+            result = ability(state)
             state.update(result)
-        return state
+            changes.update(result)
+        return changes
 
     def run(self, initial_state: Dict[str, Any]) -> Dict[str, Any]:
         """Executes the agent's workflow from the initial state."""
-        print("Starting LangGraph Agent workflow...")
-        final_state = self.graph.invoke(initial_state)
-        print("\nWorkflow completed successfully!")
-        return final_state
+        bind(ticket_id=initial_state.get("ticket_id"), stage="")
+        logger.info("Starting LangGraph Agent workflow...")
+        state = self._match_duplicate(initial_state)
+        if state is not None:
+            for stage in self.fast_path:
+                state.update(stage(state))
+            logger.info("\nWorkflow completed successfully!")
+            return self._finish_state(state)
+
+        if self.checkpointer is None:
+            final_state = self.graph.invoke(initial_state)
+            logger.info("\nWorkflow completed successfully!")
+            return self._finish_state(final_state)
+
+        config = self.thread_config(initial_state["ticket_id"])
+        final_state = self.graph.invoke(initial_state, config)
+        return self._after_checkpointed_run(config, final_state)
+
+    def _match_duplicate(self, initial_state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Pre-graph dedup: when the ticket is a near-duplicate of one decided recently,
+        returns its state with that ticket's KB results, score and escalation filled
+        in, ready for the fast-path stages. Returns None otherwise.
+        """
+        if self.dedup_index is None:
+            return None
+        match = self.dedup_index.find(initial_state.get("query") or "")
+        if match is None:
+            return None
+        ticket_id, result = match
+        logger.info("Decision: Near-duplicate of ticket %s; reusing its resolution (score: %s).",
+                    ticket_id, result.get("solution_score"))
+        return {**initial_state, **result, "duplicate_of": ticket_id}
+
+    def resume(self, ticket_id: str, answer: str) -> Dict[str, Any]:
+        """
+        Continues a ticket that was suspended waiting for the customer, starting at the
+        stage it was parked before. Earlier stages are not replayed; their output is
+        restored from the checkpoint.
+        """
+        if self.checkpointer is None:
+            raise ValueError("Checkpointing is not enabled in the agent config")
+        config = self.thread_config(ticket_id)
+        if not self.graph.get_state(config).next:
+            raise ValueError(f"Ticket {ticket_id} is not suspended")
+        bind(ticket_id=ticket_id, stage="")
+        logger.info("Resuming ticket %s with the customer's answer...", ticket_id)
+        self.graph.update_state(config, {"clarification_answer": answer})
+        final_state = self.graph.invoke(None, config)
+        return self._after_checkpointed_run(config, final_state)
+
+    def thread_config(self, ticket_id: str) -> Dict[str, Any]:
+        """LangGraph run config selecting the ticket's checkpoint thread."""
+        return {"configurable": {"thread_id": str(ticket_id)}}
+
+    def _after_checkpointed_run(self, config: Dict[str, Any], final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Marks a suspended ticket as awaiting the customer, or cleans up a finished one."""
+        next_stages = self.graph.get_state(config).next
+        if not next_stages and not self.checkpoint_settings.get('keep_completed', False):
+            self.discard_checkpoint(config["configurable"]["thread_id"])
+        return self._report_checkpointed_run(final_state, next_stages)
+
+    def _report_checkpointed_run(self, final_state: Dict[str, Any], next_stages) -> Dict[str, Any]:
+        if next_stages:
+            logger.info("\nWorkflow suspended before %s; state checkpointed.", ", ".join(next_stages))
+            return self._finish_state({**final_state, "ticket_status": "awaiting_customer"})
+        logger.info("\nWorkflow completed successfully!")
+        return self._finish_state(final_state)
+
+    def _finish_state(self, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns a ticket's final state in the form chosen by `state_backend`. Keys that
+        no stage wrote (e.g. `api_call_results` on an escalated ticket) are absent, so
+        consumers read optional fields with `.get()`.
+        """
+        return CompactState(final_state) if self.compact_state else final_state
+
+    def discard_checkpoint(self, ticket_id: str) -> None:
+        """Deletes every checkpoint stored for a ticket."""
+        with self.checkpointer.lock, self.checkpointer.cursor() as cursor:
+            cursor.execute("DELETE FROM checkpoints WHERE thread_id = ?", (str(ticket_id),))
+
+    def parked_tickets(self) -> List[str]:
+        """Ids of tickets currently suspended and waiting to be resumed."""
+        if self.checkpointer is None:
+            return []
+        with self.checkpointer.cursor(transaction=False) as cursor:
+            cursor.execute("SELECT DISTINCT thread_id FROM checkpoints")
+            thread_ids = [row[0] for row in cursor.fetchall()]
+        return [ticket_id for ticket_id in thread_ids if self.graph.get_state(self.thread_config(ticket_id)).next]
+
+    def run_stream(
+        self,
+        tickets: Iterable[Dict[str, Any]],
+        max_workers: int = 1,
+        ordered: bool = True,
+        max_in_flight: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily runs many tickets through the same compiled graph and MCP client.
+
+        Tickets are pulled from `tickets` only as capacity frees up, so at most
+        `max_in_flight` tickets (default: 2 * max_workers) are held in memory at
+        once. With `ordered=True` results are yielded in input order, otherwise
+        as soon as each ticket completes. A ticket whose run raises is yielded as
+        a `failed_state` (`ticket_status: "failed"` with the `error`) instead of
+        ending the stream.
+        """
+        if max_workers <= 1:
+            for ticket in tickets:
+                yield self._run_or_fail(ticket)
+            return
+
+        window = max_in_flight or 2 * max_workers
+        tickets = iter(tickets)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < window:
+                    ticket = next(tickets, None)
+                    if ticket is None:
+                        exhausted = True
+                    else:
+                        pending.append(executor.submit(self._run_or_fail, ticket))
+                if not pending:
+                    break
+
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in [f for f in pending if f in done]:
+                        pending.remove(future)
+                        yield future.result()
+
+    def _run_or_fail(self, ticket: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self.run(ticket)
+        except Exception as e:
+            logger.error("Ticket %s failed: %s", ticket.get("ticket_id"), e)
+            return failed_state(ticket, e)
+
+    def run_batch(self, tickets: Iterable[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        """Runs a batch of tickets and collects the final states (see `run_stream`)."""
+        return list(self.run_stream(tickets, **kwargs))
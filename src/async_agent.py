@@ -0,0 +1,147 @@
+from typing import Awaitable, Callable, Dict, Any, Iterable, List, Optional, Sequence
+import asyncio
+import os
+from .state import SupportState
+from .agent import LangGraphAgent, Step
+from .config_loader import compile_condition
+from .tracing import bind, logger
+
+
+class AsyncLangGraphAgent(LangGraphAgent):
+    """
+    Asyncio flavour of `LangGraphAgent`. The graph is identical, but every stage
+    compiles to a coroutine and abilities go through `MCPClient.aexecute_ability`, so
+    a ticket that is waiting on a slow ATLAS call yields the event loop to the other tickets.
+    A semaphore caps how many tickets are in flight at once.
+    """
+
+    def __init__(self, config_path: str = "src/config/agent_config.yaml", max_concurrency: int = 100,
+                 metrics=None):
+        super().__init__(config_path, metrics=metrics)
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # --- STAGE DEFINITIONS ---
+
+    def _compile_stage(self, stage_name: str, spec: Dict[str, Any]) -> Callable[[SupportState], Awaitable[Dict[str, Any]]]:
+        banner, parallel = spec["banner"], spec["parallel"]
+        when, log, skip_log = compile_condition(spec["when"]), spec["log"], spec["skip_log"]
+        steps = self._bind_steps(spec["steps"])
+
+        async def stage(state: SupportState) -> Dict[str, Any]:
+            self._begin_stage(stage_name, state, banner)
+            if not self._should_run(state, when, log, skip_log):
+                return {}
+            return await self.aexecute_abilities(steps, state, parallel=parallel)
+        return stage
+
+    async def aexecute_abilities(self, steps: Sequence[Step], state: SupportState,
+                                 parallel: bool = False) -> Dict[str, Any]:
+        """Async counterpart of `execute_abilities`; parallel stages are gathered on the event loop."""
+        if parallel and len(steps) > 1:
+            results = await asyncio.gather(*(
+                ability.acall(state)
+                for ability, when, log, skip_log in steps
+                if (when is None and not log) or self._should_run(state, when, log, skip_log)
+            ))
+            changes = {}
+            for result in results:
+                changes.update(result)
+            state.update(changes)
+            return changes
+
+        changes = {}
+        for ability, when, log, skip_log in steps:
+            if (when is not None or log) and not self._should_run(state, when, log, skip_log):
+                continue
+            result = await ability.acall(state)
+            state.update(result)
+            changes.update(result)
+        return changes
+
+    def make_checkpointer(self):
+        """
+        Async graphs need LangGraph's AsyncSqliteSaver, which requires the optional
+        `aiosqlite` package. The saver is bound to the event loop that first uses it.
+        """
+        try:
+            from langgraph.checkpoint.aiosqlite import AsyncSqliteSaver
+        except ImportError as e:
+            raise ImportError("Checkpointing with AsyncLangGraphAgent requires `pip install \"aiosqlite<0.21\"`") from e
+        path = self.checkpoint_path()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return AsyncSqliteSaver.from_conn_string(path)
+
+    def run(self, initial_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking convenience wrapper around `arun` for callers without an event loop."""
+        return asyncio.run(self.arun(initial_state))
+
+    async def arun(self, initial_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Executes the workflow for one ticket, waiting for a free slot if at capacity."""
+        # A semaphore belongs to one event loop, so create a fresh one per loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        async with self._semaphore:
+            bind(ticket_id=initial_state.get("ticket_id"), stage="")
+            logger.info("Starting LangGraph Agent workflow...")
+            state = self._match_duplicate(initial_state)
+            if state is not None:
+                for stage in self.fast_path:
+                    state.update(await stage(state))
+                logger.info("\nWorkflow completed successfully!")
+                return self._finish_state(state)
+
+            if self.checkpointer is None:
+                final_state = await self.graph.ainvoke(initial_state)
+                logger.info("\nWorkflow completed successfully!")
+                return self._finish_state(final_state)
+
+            config = self.thread_config(initial_state["ticket_id"])
+            final_state = await self.graph.ainvoke(initial_state, config)
+            return await self._aafter_checkpointed_run(config, final_state)
+
+    async def aresume(self, ticket_id: str, answer: str) -> Dict[str, Any]:
+        """Async counterpart of `resume`."""
+        if self.checkpointer is None:
+            raise ValueError("Checkpointing is not enabled in the agent config")
+        config = self.thread_config(ticket_id)
+        if not (await self.graph.aget_state(config)).next:
+            raise ValueError(f"Ticket {ticket_id} is not suspended")
+        bind(ticket_id=ticket_id, stage="")
+        logger.info("Resuming ticket %s with the customer's answer...", ticket_id)
+        await self.graph.aupdate_state(config, {"clarification_answer": answer})
+        final_state = await self.graph.ainvoke(None, config)
+        return await self._aafter_checkpointed_run(config, final_state)
+
+    async def _aafter_checkpointed_run(self, config: Dict[str, Any], final_state: Dict[str, Any]) -> Dict[str, Any]:
+        next_stages = (await self.graph.aget_state(config)).next
+        if not next_stages and not self.checkpoint_settings.get('keep_completed', False):
+            await self.adiscard_checkpoint(config["configurable"]["thread_id"])
+        return self._report_checkpointed_run(final_state, next_stages)
+
+    async def adiscard_checkpoint(self, ticket_id: str) -> None:
+        """Deletes every checkpoint stored for a ticket."""
+        await self.checkpointer.setup()
+        async with self.checkpointer.lock:
+            await self.checkpointer.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (str(ticket_id),))
+            await self.checkpointer.conn.commit()
+
+    async def arun_batch(self, tickets: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Runs tickets concurrently (up to `max_concurrency`) and returns results in input
+        order. That many worker tasks pull tickets from the iterable as they free up,
+        so a large or lazy input never has more than `max_concurrency` tickets in flight.
+        """
+        numbered = enumerate(tickets)
+        results: Dict[int, Dict[str, Any]] = {}
+
+        async def worker() -> None:
+            # The workers share one iterator; next() never runs concurrently on the loop
+            for index, ticket in numbered:
+                results[index] = await self.arun(ticket)
+
+        await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+        return [results[index] for index in range(len(results))]
@@ -0,0 +1,109 @@
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
+
+
+class BatchDispatcher:
+    """
+    Coalesces calls to the same ability from concurrently running tickets.
+
+    `submit` queues a ticket's state and returns a future. A batch is sent once
+    `max_batch_size` calls are waiting or `window` seconds after its first call
+    arrived, whichever comes first, as one `run_batch(ability, server, states)` call
+    whose results (one per state, in order) are fanned back out to the futures. A
+    result may be an exception instance, which fails only that call's future; an
+    exception raised by `run_batch` itself fails every call in the batch.
+    Batches run on a small thread pool so a slow one does not hold up the rest.
+    """
+
+    def __init__(self, run_batch: Callable[[str, str, List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 window: float = 0.005, max_batch_size: int = 64, max_workers: int = 4):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_workers = max_workers
+
+        self._condition = threading.Condition()
+        # (ability, server) -> (deadline, [(state, future)])
+        self._pending: Dict[Tuple[str, str], Tuple[float, List[Tuple[Dict[str, Any], Future]]]] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+        self.batches = 0
+        self.calls = 0
+
+    def submit(self, ability_name: str, server_type: str, state: Dict[str, Any]) -> Future:
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BatchDispatcher is closed")
+            if self._flusher is None:
+                self._start()
+            key = (ability_name, server_type)
+            _, calls = self._pending.setdefault(key, (time.monotonic() + self.window, []))
+            calls.append((state, future))
+            if len(calls) >= self.max_batch_size or len(calls) == 1:
+                self._condition.notify()
+        return future
+
+    def _start(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch")
+        self._flusher = threading.Thread(target=self._flush_loop, name="batch-flusher", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                due = [key for key, (deadline, calls) in self._pending.items()
+                       if deadline <= now or len(calls) >= self.max_batch_size or self._closed]
+                for key in due:
+                    _, calls = self._pending.pop(key)
+                    for start in range(0, len(calls), self.max_batch_size):
+                        self._executor.submit(self._dispatch, key, calls[start:start + self.max_batch_size])
+                if self._closed and not self._pending:
+                    return
+                if self._pending:
+                    self._condition.wait(max(0.0, min(deadline for deadline, _ in self._pending.values()) - now))
+                else:
+                    self._condition.wait()
+
+    def _dispatch(self, key: Tuple[str, str], calls: List[Tuple[Dict[str, Any], Future]]) -> None:
+        ability_name, server_type = key
+        try:
+            results = self.run_batch(ability_name, server_type, [state for state, _ in calls])
+            if len(results) != len(calls):
+                raise ValueError(f"{ability_name} batch returned {len(results)} results for {len(calls)} calls")
+        except Exception as e:
+            # Each waiting ticket sees (and logs) the failure as its own call's error
+            for _, future in calls:
+                future.set_exception(e)
+            return
+        with self._condition:
+            self.batches += 1
+            self.calls += len(calls)
+        for (_, future), result in zip(calls, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "batches": self.batches,
+                "calls": self.calls,
+                "mean_batch_size": round(self.calls / self.batches, 2) if self.batches else 0.0,
+            }
+
+    def close(self) -> None:
+        """Sends whatever is still queued and stops the dispatcher threads."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            flusher, executor = self._flusher, self._executor
+        if flusher is not None:
+            flusher.join()
+            executor.shutdown(wait=True)
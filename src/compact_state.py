@@ -0,0 +1,157 @@
+from typing import Dict, Any, Iterator, Optional
+from collections.abc import Mapping
+import sys
+
+from .state import SupportState
+
+_FIELDS = tuple(SupportState.__annotations__)
+# Top-level booleans are stored as two bits each (present, value) in one int
+_BOOL_FIELDS = ("escalation_required", "notifications_sent")
+_SLOT_FIELDS = tuple(field for field in _FIELDS if field not in _BOOL_FIELDS)
+
+# Strings up to this length are interned so tickets share one copy of statuses,
+# tiers, timestamps, KB titles and URLs
+_INTERN_MAX_LENGTH = 64
+# Cap on the table of shared tuples, so distinct values cannot grow it forever
+_SHARED_MAX_ENTRIES = 65536
+_shared: Dict[Any, Any] = {}
+
+
+class _Record(tuple):
+    """A packed dict: (keys, values), both tuples."""
+    __slots__ = ()
+
+
+class _Flags(tuple):
+    """A packed dict of booleans: (keys, bits)."""
+    __slots__ = ()
+
+
+class _List(tuple):
+    """A packed list."""
+    __slots__ = ()
+
+
+def _strict_key(value):
+    # Tuples compare equal across types (True == 1, _List == tuple), so key on types too
+    if isinstance(value, tuple):
+        return (type(value), tuple(_strict_key(item) for item in value))
+    return (type(value), value)
+
+
+def _share(value):
+    """Returns the canonical instance of an identical hashable value, if one is already known."""
+    try:
+        key = _strict_key(value)
+        shared = _shared.get(key)
+    except TypeError:
+        return value
+    if shared is not None:
+        return shared
+    if len(_shared) < _SHARED_MAX_ENTRIES:
+        _shared[key] = value
+    return value
+
+
+def _pack(value, query: Optional[str]):
+    if type(value) is str:
+        if value == query:
+            return query  # e.g. structured_data["customer_query"] references the query
+        return sys.intern(value) if len(value) <= _INTERN_MAX_LENGTH else value
+    if type(value) is dict:
+        keys = _share(tuple(sys.intern(key) if type(key) is str else key for key in value))
+        values = tuple(value.values())
+        if values and all(type(item) is bool for item in values):
+            bits = 0
+            for i, item in enumerate(values):
+                bits |= item << i
+            return _share(_Flags((keys, bits)))
+        return _share(_Record((keys, _share(tuple(_pack(item, query) for item in values)))))
+    if type(value) is list:
+        return _share(_List(_pack(item, query) for item in value))
+    return value
+
+
+def _unpack(value):
+    if isinstance(value, _Record):
+        keys, values = value
+        return {key: _unpack(item) for key, item in zip(keys, values)}
+    if isinstance(value, _Flags):
+        keys, bits = value
+        return {key: bool(bits >> i & 1) for i, key in enumerate(keys)}
+    if isinstance(value, _List):
+        return [_unpack(item) for item in value]
+    return value
+
+
+class CompactState(Mapping):
+    """
+    Read-only, memory-lean form of a ticket's state for holding many finished
+    tickets at once.
+
+    Each SupportState field is a slot instead of a dict entry; boolean fields are
+    bits of one int. Nested dicts and lists are packed into tuples that share
+    their key tuples, and equal packed values (the same SLA data, flags or KB
+    hits on many tickets) are stored once. Short strings are interned, and copies
+    of the query inside nested data point back at the query itself. Reading a
+    nested field rebuilds a fresh dict/list; `to_dict()` returns a plain state.
+    """
+
+    __slots__ = _SLOT_FIELDS + ("_bits", "_extra")
+
+    def __init__(self, state: Dict[str, Any]):
+        query = state.get("query")
+        bits = 0
+        extra = None
+        for key, value in state.items():
+            if key in _BOOL_FIELDS and type(value) is bool:
+                index = _BOOL_FIELDS.index(key) * 2
+                bits |= (1 | value << 1) << index
+            elif key in _SLOT_FIELDS:
+                object.__setattr__(self, key, _pack(value, query))
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = _pack(value, query)
+        object.__setattr__(self, "_bits", bits)
+        object.__setattr__(self, "_extra", extra)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactState is read-only; use to_dict() for a mutable copy")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _BOOL_FIELDS:
+            index = _BOOL_FIELDS.index(key) * 2
+            if self._bits >> index & 1:
+                return bool(self._bits >> (index + 1) & 1)
+        elif key in _SLOT_FIELDS:
+            try:
+                return _unpack(getattr(self, key))
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return _unpack(self._extra[key])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in _FIELDS:
+            if key in _BOOL_FIELDS:
+                if self._bits >> (_BOOL_FIELDS.index(key) * 2) & 1:
+                    yield key
+            elif hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"CompactState({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Re-pack on unpickling so values are shared in the receiving process too
+        return (CompactState, (self.to_dict(),))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self)
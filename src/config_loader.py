@@ -0,0 +1,205 @@
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import hashlib
+import json
+import marshal
+import operator
+import os
+import re
+
+# Bump when the plan layout or validation rules change, so stale artifacts are rebuilt
+PLAN_VERSION = 3
+
+STAGE_MODES = ("deterministic", "non-deterministic", "parallel")
+SERVER_TYPES = ("COMMON", "ATLAS", "STATE")
+END = "END"
+
+_CONDITION_RE = re.compile(
+    r"^\s*(?P<negate>not\s+)?(?:len\((?P<length>\w+)\)|(?P<field>\w+))"
+    r"(?:\s*(?P<op><=|>=|==|!=|<|>)\s*(?P<value>.+?))?\s*$"
+)
+_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+              "==": operator.eq, "!=": operator.ne}
+
+
+def parse_condition(text: Any) -> Optional[tuple]:
+    """
+    Parses a `when` clause into (negate, field, use_length, op, value), or None for
+    no condition. Raises ValueError for anything outside the small grammar.
+    """
+    if text is None:
+        return None
+    match = _CONDITION_RE.match(str(text))
+    if not match or (match.group("length") and not match.group("op")):
+        raise ValueError(f"Invalid condition: {text!r}")
+    value = match.group("value")
+    if value is not None:
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = value.strip("'\"")
+    return (bool(match.group("negate")), match.group("length") or match.group("field"),
+            bool(match.group("length")), match.group("op"), value)
+
+
+def compile_condition(condition: Optional[tuple]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Turns a parsed condition into a predicate over the ticket state."""
+    if condition is None:
+        return None
+    negate, field, use_length, op, value = condition
+    if use_length:
+        compare = _OPERATORS[op]
+        return lambda state: compare(len(state.get(field) or ""), value) != negate
+    if op is None:
+        return lambda state: bool(state.get(field)) != negate
+    compare = _OPERATORS[op]
+    return lambda state: compare(state.get(field), value) != negate
+
+
+def validate_config(config: Any) -> None:
+    """Checks the shape of agent_config.yaml, raising ValueError on the first problem found."""
+    if not isinstance(config, dict):
+        raise ValueError("Invalid agent config: expected a mapping at the top level")
+    if not isinstance(config.get('input_schema', []), list):
+        raise ValueError("Invalid agent config: input_schema must be a list of field names")
+    stages = config.get('stages')
+    if not isinstance(stages, dict) or not stages:
+        raise ValueError("Invalid agent config: stages must be a non-empty mapping")
+    for stage_name, stage in stages.items():
+        if not isinstance(stage, dict):
+            raise ValueError(f"Invalid agent config: stage {stage_name} must be a mapping")
+        if stage.get('mode', 'deterministic') not in STAGE_MODES:
+            raise ValueError(f"Invalid agent config: stage {stage_name} has unknown mode {stage.get('mode')!r}")
+        abilities = stage.get('abilities', [])
+        if not isinstance(abilities, list):
+            raise ValueError(f"Invalid agent config: abilities of stage {stage_name} must be a list")
+        for ability in abilities:
+            if not isinstance(ability, dict) or not isinstance(ability.get('name'), str):
+                raise ValueError(f"Invalid agent config: every ability of stage {stage_name} needs a name")
+            if ability.get('server') not in SERVER_TYPES:
+                raise ValueError(
+                    f"Invalid agent config: ability {ability['name']} in stage {stage_name} "
+                    f"has unknown server {ability.get('server')!r}"
+                )
+            _check_condition(ability.get('when'), f"ability {ability['name']} in stage {stage_name}")
+        _check_condition(stage.get('when'), f"stage {stage_name}")
+        for route in _routes(stage):
+            if route.get('to') != END and route.get('to') not in stages:
+                raise ValueError(f"Invalid agent config: stage {stage_name} routes to unknown stage {route.get('to')!r}")
+            _check_condition(route.get('when'), f"a route of stage {stage_name}")
+    for stage_name in (config.get('dedup') or {}).get('fast_path', []):
+        if stage_name not in stages:
+            raise ValueError(f"Invalid agent config: dedup.fast_path names unknown stage {stage_name!r}")
+
+
+def _check_condition(text: Any, where: str) -> None:
+    try:
+        parse_condition(text)
+    except ValueError as e:
+        raise ValueError(f"Invalid agent config: {where}: {e}") from None
+
+
+def _routes(stage: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """A stage's `next` as a list of routes; a bare stage name is one unconditional route."""
+    next_stage = stage.get('next', END)
+    if isinstance(next_stage, list):
+        return next_stage
+    return [{"to": next_stage}]
+
+
+def compile_plan(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduces the config to what building and running the graph needs: the entry
+    stage and, per stage, its banner, whether it runs in parallel, its condition
+    and log lines, the (ability, server, when, log, skip_log) steps to call and
+    its routes. STATE abilities are dropped. Stages with nothing to do are left
+    out and edges into them are redirected to their successor, unless the
+    checkpoint config suspends before them.
+    """
+    suspend_before = set((config.get('checkpoint') or {}).get('suspend_before', ['WAIT']))
+    stages = {}
+    for index, (stage_name, stage) in enumerate(config['stages'].items(), start=1):
+        banner = f"STAGE {index}: {stage_name}"
+        if stage.get('mode') == 'non-deterministic':
+            banner += " (Non-deterministic)"
+        stages[stage_name] = {
+            "banner": banner,
+            "parallel": stage.get('mode') == 'parallel',
+            "when": parse_condition(stage.get('when')),
+            "log": stage.get('log'),
+            "skip_log": stage.get('skip_log'),
+            "steps": [
+                (ability['name'], ability['server'], parse_condition(ability.get('when')),
+                 ability.get('log'), ability.get('skip_log'))
+                for ability in stage.get('abilities', []) if ability['server'] != 'STATE'
+            ],
+            "routes": [(route['to'], parse_condition(route.get('when')), route.get('log'))
+                       for route in _routes(stage)],
+        }
+
+    skipped = {
+        stage_name: stage["routes"][0][0]
+        for stage_name, stage in stages.items()
+        if not stage["steps"] and stage["when"] is None and not stage["log"]
+        and len(stage["routes"]) == 1 and stage_name not in suspend_before
+    }
+
+    def resolve(target: str) -> str:
+        seen = set()
+        while target in skipped and target not in seen:
+            seen.add(target)
+            target = skipped[target]
+        return target
+
+    for stage in stages.values():
+        stage["routes"] = [(resolve(target), when, log) for target, when, log in stage["routes"]]
+    return {
+        "entry": resolve(next(iter(stages))),
+        "stages": {name: stage for name, stage in stages.items() if name not in skipped},
+    }
+
+
+def plan_cache_path(config_path: str) -> str:
+    directory, name = os.path.split(config_path)
+    return os.path.join(directory, ".cache", name + ".plan")
+
+
+def load_config(config_path: str, cache_path: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Returns the validated config and its execution plan.
+
+    Both are cached in a marshal artifact next to the config (`.cache/<name>.plan`),
+    keyed by a hash of the YAML bytes. While the YAML is unchanged, startup reads
+    the artifact and skips importing yaml, parsing and validating it.
+    """
+    with open(config_path, 'rb') as file:
+        source = file.read()
+    digest = hashlib.sha256(source).hexdigest()
+    cache_path = cache_path or plan_cache_path(config_path)
+
+    try:
+        with open(cache_path, 'rb') as file:
+            artifact = marshal.load(file)
+        if artifact.get("version") == PLAN_VERSION and artifact.get("hash") == digest:
+            return artifact["config"], artifact["plan"]
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        pass
+
+    import yaml
+    config = yaml.safe_load(source)
+    validate_config(config)
+    plan = compile_plan(config)
+    _write_artifact(cache_path, {"version": PLAN_VERSION, "hash": digest, "config": config, "plan": plan})
+    return config, plan
+
+
+def _write_artifact(path: str, artifact: Dict[str, Any]) -> None:
+    # Caching is best effort: read-only deployments and exotic YAML values just skip it
+    try:
+        data = marshal.dumps(artifact)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError):
+        pass
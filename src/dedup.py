@@ -0,0 +1,140 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import re
+import threading
+import time
+
+# Used when agent_config.yaml has no `dedup` section
+DEFAULT_DEDUP = {
+    "enabled": False,
+    "shingle_size": 2,
+    "max_distance": 6,
+    "window_seconds": 600,
+    "max_entries": 10000,
+    "fast_path": ["PREPARE", "UPDATE", "CREATE", "DO"],
+}
+
+# What a duplicate inherits from the ticket it matches
+REUSED_FIELDS = ("kb_results", "solution_score", "escalation_required")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_BITS = 64
+
+
+def simhash(text: str, shingle_size: int = 2) -> int:
+    """
+    64-bit SimHash of a query's word shingles. Case, punctuation and spacing are
+    ignored, and queries that differ in a few words land a few bits apart.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) > shingle_size:
+        shingles = {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+    else:
+        shingles = {" ".join(words)}
+    counts = [0] * _BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(_BITS):
+            counts[bit] += value >> bit & 1
+    half = len(shingles) / 2
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class NearDuplicateIndex:
+    """
+    Sliding window of recently decided tickets, searchable by SimHash distance.
+
+    Fingerprints are split into `max_distance + 1` bands. Two fingerprints at most
+    `max_distance` bits apart agree on at least one whole band, so a lookup only
+    compares against entries that share a band instead of scanning the window.
+    Entries older than `window_seconds`, or beyond `max_entries`, are evicted
+    oldest first.
+    """
+
+    def __init__(self, shingle_size: int = 2, max_distance: int = 6, window_seconds: float = 600,
+                 max_entries: int = 10000, clock=time.monotonic):
+        self.shingle_size = shingle_size
+        self.max_distance = max_distance
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        bands = max_distance + 1
+        width = _BITS // bands
+        self._bands = [(i * width, (1 << (_BITS - i * width if i == bands - 1 else width)) - 1) for i in range(bands)]
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._buckets: List[Dict[int, set]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _keys(self, fingerprint: int) -> List[int]:
+        return [fingerprint >> shift & mask for shift, mask in self._bands]
+
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            ticket_id, (added, fingerprint, _) = next(iter(self._entries.items()))
+            if now - added <= self.window_seconds and len(self._entries) <= self.max_entries:
+                break
+            self._remove(ticket_id, fingerprint)
+
+    def _remove(self, ticket_id: str, fingerprint: int) -> None:
+        del self._entries[ticket_id]
+        for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+            bucket = buckets[key]
+            bucket.discard(ticket_id)
+            if not bucket:
+                del buckets[key]
+
+    def add(self, ticket_id: str, query: str, result: Dict[str, Any]) -> None:
+        """Remembers a decided ticket's reusable `result` under its query's fingerprint."""
+        fingerprint = simhash(query, self.shingle_size)
+        with self._lock:
+            if ticket_id in self._entries:
+                self._remove(ticket_id, self._entries[ticket_id][1])
+            self._entries[ticket_id] = (self.clock(), fingerprint, result)
+            for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+                buckets.setdefault(key, set()).add(ticket_id)
+            self._evict(self.clock())
+
+    def find(self, query: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Returns (ticket_id, result) of the closest recent ticket within `max_distance`, if any."""
+        fingerprint = simhash(query, self.shingle_size)
+        with self._lock:
+            self._evict(self.clock())
+            best = None
+            for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+                for ticket_id in buckets.get(key, ()):
+                    distance = bin(fingerprint ^ self._entries[ticket_id][1]).count("1")
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, ticket_id)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return best[1], self._entries[best[1]][2]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def build_dedup_index(settings: Optional[Dict[str, Any]] = None) -> Optional[NearDuplicateIndex]:
+    """Builds an index from the `dedup` section of agent_config.yaml; None when disabled."""
+    settings = {**DEFAULT_DEDUP, **(settings or {})}
+    if not settings["enabled"]:
+        return None
+    return NearDuplicateIndex(
+        shingle_size=settings["shingle_size"],
+        max_distance=settings["max_distance"],
+        window_seconds=settings["window_seconds"],
+        max_entries=settings["max_entries"],
+    )
+
+
+def fast_path_stages(settings: Optional[Dict[str, Any]] = None) -> List[str]:
+    return list({**DEFAULT_DEDUP, **(settings or {})}["fast_path"])
@@ -0,0 +1,388 @@
+"""
+Streaming ingestion: reads tickets from a JSONL file, stdin or a SQLite-backed
+queue, validates them against `input_schema`, runs them through the agent with a
+bounded in-flight window and writes finished states to a sink in bulk.
+
+Delivery is at-least-once. A source only forgets a ticket once it is acknowledged,
+and tickets are acknowledged only after their final state is durably in the sink.
+After a crash, unacknowledged tickets are delivered again. The sink remembers which
+`ticket_id`s it already holds, so redelivered tickets that had completed are skipped
+instead of being run and written twice.
+"""
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+from collections import deque
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from .state import Priority, SupportState
+from .tracing import logger
+
+DEFAULT_INGESTION = {
+    "max_in_flight": 64,
+    "flush_size": 100,
+    "flush_interval": 1.0,
+    "lease_seconds": 300,
+    "prefetch": 16,
+}
+
+_PRIORITIES = {priority.value for priority in Priority}
+# Text fields of the ticket payload; only `ticket_id` may also be given as a number
+_TEXT_FIELDS = tuple(field for field, annotation in SupportState.__annotations__.items()
+                     if annotation in (str, Optional[str]))
+
+
+def _decode(line):
+    # Undecodable lines are passed on as text so validation rejects them with the rest
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode('utf-8', 'replace') if isinstance(line, bytes) else line
+
+
+def validate_ticket(record: Any, schema: Iterable[str]) -> Optional[str]:
+    """Returns why `record` is not a valid ticket, or None if it is."""
+    if not isinstance(record, dict):
+        return "record is not a JSON object"
+    for field in schema:
+        value = record.get(field)
+        if value is None or value == "":
+            return f"missing required field {field!r}"
+        if field == "priority" and value not in _PRIORITIES:
+            return f"unknown priority {value!r}"
+    for field in _TEXT_FIELDS:
+        value = record.get(field)
+        if value is None or isinstance(value, str):
+            continue
+        if field == "ticket_id" and isinstance(value, int) and not isinstance(value, bool):
+            continue
+        return f"field {field!r} must be a string"
+    return None
+
+
+class JsonlSource:
+    """
+    Yields (ticket, offset) pairs from a JSONL file, or from stdin when `path` is "-".
+
+    For files, the byte offset up to which every line has been acknowledged is kept
+    in `<path>.offset`, and a restarted run continues from there. Acknowledgements
+    may arrive in any order; the offset only advances over a contiguous acked prefix.
+    """
+
+    def __init__(self, path: str, offset_path: Optional[str] = None):
+        self.path = path
+        self.offset_path = None if path == "-" else (offset_path or path + ".offset")
+        self._outstanding = deque()
+        self._acked: Set[int] = set()
+
+    def committed_offset(self) -> int:
+        if self.offset_path is None:
+            return 0
+        try:
+            with open(self.offset_path, 'r') as file:
+                return int(file.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def __iter__(self) -> Iterator[Tuple[Any, int]]:
+        if self.offset_path is None:
+            stream = sys.stdin.buffer
+            offset = 0
+        else:
+            stream = open(self.path, 'rb')
+            offset = self.committed_offset()
+            stream.seek(offset)
+        try:
+            for line in stream:
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                self._outstanding.append(offset)
+                yield _decode(line), offset
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+    def ack(self, offsets: Iterable[int]) -> None:
+        self._acked.update(offsets)
+        committed = None
+        while self._outstanding and self._outstanding[0] in self._acked:
+            committed = self._outstanding.popleft()
+            self._acked.discard(committed)
+        if committed is not None and self.offset_path is not None:
+            tmp_path = f"{self.offset_path}.tmp"
+            with open(tmp_path, 'w') as file:
+                file.write(str(committed))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.offset_path)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteQueue:
+    """
+    A local, durable message queue in one SQLite table.
+
+    Consumers lease messages for `lease_seconds`; `ack` deletes them. A message whose
+    lease runs out without an ack (its consumer crashed) is delivered again. With
+    `follow=True`, iteration waits for new messages instead of stopping when the
+    queue is empty.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300, prefetch: int = 16,
+                 follow: bool = False, poll_interval: float = 0.5):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.prefetch = prefetch
+        self.follow = follow
+        self.poll_interval = poll_interval
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Acks may come from another thread (the ingest flusher) than the claims
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS queue ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, lease_until REAL)"
+        )
+
+    def put(self, tickets: Iterable[Dict[str, Any]]) -> int:
+        """Enqueues tickets in one transaction. Returns the number added."""
+        rows = [(json.dumps(ticket, default=str),) for ticket in tickets]
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("INSERT INTO queue (payload) VALUES (?)", rows)
+        return len(rows)
+
+    def _claim(self) -> List[Tuple[int, str]]:
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute(
+                "SELECT id, payload FROM queue WHERE lease_until IS NULL OR lease_until < ? ORDER BY id LIMIT ?",
+                (now, self.prefetch),
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE queue SET lease_until = ? WHERE id = ?",
+                [(now + self.lease_seconds, row[0]) for row in rows],
+            )
+        return rows
+
+    def __iter__(self) -> Iterator[Tuple[Any, int]]:
+        while True:
+            rows = self._claim()
+            if not rows:
+                if not self.follow:
+                    return
+                time.sleep(self.poll_interval)
+                continue
+            for message_id, payload in rows:
+                yield _decode(payload), message_id
+
+    def ack(self, message_ids: Iterable[int]) -> None:
+        ids = [(message_id,) for message_id in message_ids]
+        if ids:
+            with self._lock, self.conn:
+                self.conn.execute("BEGIN")
+                self.conn.executemany("DELETE FROM queue WHERE id = ?", ids)
+
+    def pending(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class JsonlSink:
+    """
+    Appends final states to a JSONL file in bulk, fsyncing each batch.
+
+    On open it reads back the `ticket_id`s already written (dropping a torn last
+    line left by a crash mid-write), so `completed` tells the pipeline which
+    redelivered tickets to skip.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Set[str] = set()
+        good_bytes = 0
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    good_bytes += len(line)
+                    try:
+                        self.completed.add(str(json.loads(line)["ticket_id"]))
+                    except (ValueError, KeyError, TypeError):
+                        pass
+            if good_bytes != os.path.getsize(path):
+                os.truncate(path, good_bytes)
+        self.file = open(path, 'a')
+
+    def write_many(self, states: List[Dict[str, Any]]) -> None:
+        if not states:
+            return
+        # dict() also unpacks CompactState results
+        self.file.write("".join(json.dumps(dict(state), default=str) + "\n" for state in states))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.completed.update(str(state["ticket_id"]) for state in states if "ticket_id" in state)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def ingest(runner, source, sink, schema: Iterable[str] = (), settings: Optional[Dict[str, Any]] = None,
+           rejects: Optional[JsonlSink] = None, **stream_options) -> Dict[str, int]:
+    """
+    Pulls tickets from `source` through `runner.run_stream` and writes them to `sink`.
+
+    Tickets are read from the source only when the runner has room for them, so a
+    slow stage or a slow sink throttles ingestion instead of filling memory. Finished
+    states are written once `flush_size` are buffered, and a background thread flushes
+    every `flush_interval` seconds even while the source is idle or the in-flight
+    window is filling. States are acknowledged only once written. Invalid records are
+    logged, written to `rejects` if given, and acknowledged so they are not redelivered.
+    The same goes for tickets the runner reports as failed (`ticket_status: "failed"`),
+    so one bad message cannot block the stream. Tickets parked by checkpointing are acknowledged without being written; their
+    state lives in the checkpoint store until `resume`. A ticket delivered again while
+    its first delivery is still running is not run twice; its token is acknowledged
+    together with the original's.
+
+    `stream_options` are passed to `run_stream` (e.g. max_workers for an agent).
+    """
+    settings = {**DEFAULT_INGESTION, **(settings or {})}
+    schema = list(schema)
+    stats = {"completed": 0, "parked": 0, "rejected": 0, "failed": 0, "duplicates": 0}
+    # (token, record) of every ticket handed to the runner, in input order
+    tokens = deque()
+    # ticket_id -> tokens of redeliveries that arrived while the ticket was running
+    in_progress: Dict[str, List[Any]] = {}
+    buffer: List[Dict[str, Any]] = []
+    acks: List[Any] = []
+    # Guards the above, the sink and the source's acks against the flusher thread
+    lock = threading.Lock()
+    stopped = threading.Event()
+    failures: List[BaseException] = []
+    last_flush = time.monotonic()
+
+    def tickets() -> Iterator[Dict[str, Any]]:
+        for record, token in source:
+            with lock:
+                error = validate_ticket(record, schema)
+                if error:
+                    logger.warning("Rejected ticket: %s", error)
+                    stats["rejected"] += 1
+                    if rejects is not None:
+                        rejects.write_many([{"error": error, "record": record}])
+                    acks.append(token)
+                    continue
+                ticket_id = str(record["ticket_id"])
+                if ticket_id in sink.completed:
+                    stats["duplicates"] += 1
+                    acks.append(token)
+                    continue
+                if ticket_id in in_progress:
+                    # Acking now could delete a queue message the first delivery still needs
+                    stats["duplicates"] += 1
+                    in_progress[ticket_id].append(token)
+                    continue
+                in_progress[ticket_id] = []
+                tokens.append((token, record))
+            yield record
+
+    def flush() -> None:
+        nonlocal last_flush
+        sink.write_many(buffer)
+        for state in buffer:
+            acks.extend(in_progress.pop(str(state["ticket_id"]), ()))
+        source.ack(acks)
+        buffer.clear()
+        acks.clear()
+        last_flush = time.monotonic()
+
+    def flush_on_timer() -> None:
+        while not stopped.is_set():
+            with lock:
+                wait = last_flush + settings["flush_interval"] - time.monotonic()
+                if wait <= 0:
+                    try:
+                        flush()
+                    except Exception as e:
+                        failures.append(e)
+                        return
+                    continue
+            stopped.wait(wait)
+
+    if "max_workers" in stream_options:
+        stream_options.setdefault("max_in_flight", settings["max_in_flight"])
+    flusher = threading.Thread(target=flush_on_timer, name="ingest-flush", daemon=True)
+    flusher.start()
+    try:
+        for state in runner.run_stream(tickets(), ordered=True, **stream_options):
+            if failures:
+                raise failures[0]
+            with lock:
+                token, record = tokens.popleft()
+                acks.append(token)
+                status = state.get("ticket_status")
+                if status == "failed":
+                    # Dead-lettered rather than retried: it would fail again on redelivery
+                    logger.error("Ticket %s failed: %s", record["ticket_id"], state.get("error"))
+                    stats["failed"] += 1
+                    if rejects is not None:
+                        rejects.write_many([{"error": state.get("error"), "record": record}])
+                    acks.extend(in_progress.pop(str(record["ticket_id"]), ()))
+                elif status == "awaiting_customer":
+                    stats["parked"] += 1
+                    acks.extend(in_progress.pop(str(state["ticket_id"]), ()))
+                else:
+                    stats["completed"] += 1
+                    buffer.append(state)
+                if len(buffer) >= settings["flush_size"]:
+                    flush()
+    finally:
+        stopped.set()
+        flusher.join()
+        # Whatever finished before a failure is kept; the rest is redelivered next run
+        with lock:
+            flush()
+    if failures:
+        raise failures[0]
+    return stats
+
+
+def open_source(spec: str, settings: Optional[Dict[str, Any]] = None, follow: bool = False):
+    """`-` reads stdin, `queue:PATH` a SqliteQueue, anything else a JSONL file."""
+    settings = {**DEFAULT_INGESTION, **(settings or {})}
+    if spec.startswith("queue:"):
+        return SqliteQueue(spec[len("queue:"):], lease_seconds=settings["lease_seconds"],
+                           prefetch=settings["prefetch"], follow=follow)
+    return JsonlSource(spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the SQLite ticket queue used by --ingest queue:PATH.")
+    parser.add_argument("queue", help="Path of the queue database")
+    parser.add_argument("--put", metavar="JSONL", help="Enqueue every ticket in this JSONL file")
+    args = parser.parse_args()
+
+    queue = SqliteQueue(args.queue)
+    if args.put:
+        with open(args.put, 'rb') as file:
+            added = queue.put(_decode(line) for line in file if line.strip())
+        print(f"Enqueued {added} tickets")
+    print(f"{queue.pending()} tickets pending in {args.queue}")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from typing import Dict, Any, List, Optional
+import re
+
+# Used when agent_config.yaml has no `vocabularies` section
+DEFAULT_VOCABULARIES: Dict[str, List[str]] = {
+    "technical": ["error", "bug", "crash", "failure", "timeout", "database", "server", "production"],
+    "urgency": ["urgent", "critical", "immediately", "asap", "emergency"],
+    "request_urgency": ["urgent", "asap", "immediately"],
+    "follow_up": ["follow up"],
+    "product": ["product"],
+    "account": ["account"],
+    "january": ["january"],
+}
+
+
+class KeywordScanner:
+    """
+    Finds every vocabulary term in a text with one pass of a single compiled regex.
+
+    Terms match as case-insensitive substrings, the same as `term in text.lower()`.
+    The pattern is a zero-width lookahead over all terms (longest first), so it is
+    tried at every position and overlapping terms are found; terms that are a prefix
+    of a longer match at the same position are implied by that match.
+    """
+
+    def __init__(self, vocabularies: Dict[str, List[str]]):
+        self.vocabularies = {category: [term.lower() for term in terms] for category, terms in vocabularies.items()}
+
+        terms = sorted({term for terms in self.vocabularies.values() for term in terms}, key=lambda t: (-len(t), t))
+        self._implied = {term: [other for other in terms if term.startswith(other)] for term in terms}
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(term) for term in terms) + "))") if terms else None
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Returns, per category, the terms present in `text` (in vocabulary order)."""
+        found = set()
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text.lower()):
+                term = match.group(1)
+                if term not in found:
+                    found.update(self._implied[term])
+        return {
+            category: [term for term in terms if term in found]
+            for category, terms in self.vocabularies.items()
+        }
+
+
+_scanner: Optional[KeywordScanner] = None
+
+
+def configure_scanner(vocabularies: Optional[Dict[str, List[str]]] = None) -> KeywordScanner:
+    """
+    Compiles the module-wide scanner used by abilities called without one (e.g. by
+    `mcp_server`). Agents build their own from their config and bind it instead.
+    """
+    global _scanner
+    _scanner = KeywordScanner(vocabularies or DEFAULT_VOCABULARIES)
+    return _scanner
+
+
+def get_scanner() -> KeywordScanner:
+    return _scanner or configure_scanner()
+
+
+def keyword_hits(state: Dict[str, Any], scanner: Optional[KeywordScanner] = None) -> Dict[str, List[str]]:
+    """The ticket's keyword hit map: cached in state by INTAKE, scanned on demand otherwise."""
+    hits = state.get("keyword_hits")
+    if hits is None:
+        hits = (scanner or get_scanner()).scan(state["query"])
+    return hits
@@ -0,0 +1,340 @@
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from array import array
+from collections import OrderedDict
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+
+_MAGIC = b"LKB1"
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from has have how i if in is it its me my "
+    "not of on or our so that the this to was we what when with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cases and splits text into index terms, dropping stopwords."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def read_article(path: str) -> Tuple[str, str]:
+    """Reads a markdown article: the first `# ` heading is the title, the rest is the body."""
+    with open(path, 'r', encoding='utf-8') as file:
+        text = file.read()
+    title, _, body = text.partition("\n")
+    return title.lstrip("#").strip(), body
+
+
+class KnowledgeBase:
+    """
+    BM25 search over a directory of markdown KB articles.
+
+    The index is persisted to `index_path` as a JSON header (document table and
+    term lexicon) followed by a flat array of (document, term frequency) postings.
+    At startup the postings are memory-mapped rather than rebuilt; articles that
+    were added, changed or deleted since the index was written are applied
+    incrementally. Added documents live in an in-memory segment and removed ones
+    are tombstoned until the next `save()`, which compacts everything into a new
+    file. Results are cached per normalized query in a bounded LRU.
+    """
+
+    def __init__(self, articles_dir: str, index_path: Optional[str] = None,
+                 base_url: str = "https://kb.example.com", cache_size: int = 1024,
+                 k1: float = 1.5, b: float = 0.75):
+        self.articles_dir = articles_dir
+        self.index_path = index_path
+        self.base_url = base_url.rstrip("/")
+        self.cache_size = cache_size
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Document table: docnum -> [article_id, title, url, length, mtime]; None once removed
+        self._docs: List[Optional[list]] = []
+        self._docnum_by_id: Dict[str, int] = {}
+        self._total_length = 0
+
+        # Base segment (memory-mapped) and in-memory delta segment
+        self._file = None
+        self._mmap = None
+        self._postings = None
+        self._lexicon: Dict[str, Tuple[int, int]] = {}
+        self._delta: Dict[str, Dict[int, int]] = {}
+        self._tombstones = set()
+
+    # --- LIFECYCLE ---
+
+    def open(self) -> "KnowledgeBase":
+        """Loads the on-disk index if present, then syncs it with the articles directory."""
+        with self._lock:
+            if self.index_path and os.path.exists(self.index_path):
+                self._load(self.index_path)
+            if self.sync() and self.index_path:
+                self.save()
+        return self
+
+    def close(self) -> None:
+        with self._lock:
+            if self._postings is not None:
+                self._postings.release()
+            self._postings = None
+            if self._mmap is not None:
+                self._mmap.close()
+                self._file.close()
+            self._mmap = self._file = None
+
+    def sync(self) -> bool:
+        """Indexes new or modified articles and drops deleted ones. Returns True if anything changed."""
+        if not os.path.isdir(self.articles_dir):
+            return False
+        on_disk = {}
+        for name in os.listdir(self.articles_dir):
+            if name.endswith(".md"):
+                path = os.path.join(self.articles_dir, name)
+                on_disk[name[:-3]] = (path, os.path.getmtime(path))
+
+        changed = False
+        with self._lock:
+            for article_id in list(self._docnum_by_id):
+                if article_id not in on_disk:
+                    self.remove_article(article_id)
+                    changed = True
+            for article_id, (path, mtime) in sorted(on_disk.items()):
+                docnum = self._docnum_by_id.get(article_id)
+                if docnum is not None and self._docs[docnum][4] == mtime:
+                    continue
+                title, body = read_article(path)
+                self.add_article(article_id, title, body, mtime=mtime)
+                changed = True
+        return changed
+
+    # --- MUTATION ---
+
+    def add_article(self, article_id: str, title: str, body: str,
+                    url: Optional[str] = None, mtime: float = 0.0) -> None:
+        """Adds (or replaces) an article in the in-memory segment."""
+        terms = tokenize(title + "\n" + body)
+        with self._lock:
+            if article_id in self._docnum_by_id:
+                self.remove_article(article_id)
+            docnum = len(self._docs)
+            self._docs.append([article_id, title, url or f"{self.base_url}/{article_id}", len(terms), mtime])
+            self._docnum_by_id[article_id] = docnum
+            self._total_length += len(terms)
+            for term in terms:
+                postings = self._delta.setdefault(term, {})
+                postings[docnum] = postings.get(docnum, 0) + 1
+            self._cache.clear()
+
+    def remove_article(self, article_id: str) -> bool:
+        """Tombstones an article so it no longer appears in results."""
+        with self._lock:
+            docnum = self._docnum_by_id.pop(article_id, None)
+            if docnum is None:
+                return False
+            self._total_length -= self._docs[docnum][3]
+            self._docs[docnum] = None
+            self._tombstones.add(docnum)
+            self._cache.clear()
+            return True
+
+    # --- SEARCH ---
+
+    def search(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """Returns the `top_k` articles ranked by BM25 against `query`, with scores."""
+        terms = tokenize(query)
+        key = (tuple(sorted(terms)), top_k)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+            results = self._rank(terms, top_k)
+            self._cache[key] = results
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return results
+
+    def search_many(self, queries: List[str], top_k: int = 3) -> List[List[Dict[str, Any]]]:
+        """`search` for several queries at once; repeated queries are ranked only once."""
+        with self._lock:
+            unique = {query: self.search(query, top_k) for query in dict.fromkeys(queries)}
+        return [unique[query] for query in queries]
+
+    def _rank(self, terms: List[str], top_k: int) -> List[Dict[str, Any]]:
+        num_docs = len(self._docnum_by_id)
+        if not num_docs or not terms:
+            return []
+        avg_length = self._total_length / num_docs
+
+        scores: Dict[int, float] = {}
+        query_tf: Dict[str, int] = {}
+        for term in terms:
+            query_tf[term] = query_tf.get(term, 0) + 1
+
+        for term, weight in query_tf.items():
+            postings = [(docnum, tf) for docnum, tf in self._iter_postings(term)
+                        if docnum not in self._tombstones]
+            if not postings:
+                continue
+            idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for docnum, tf in postings:
+                length_norm = 1 - self.b + self.b * self._docs[docnum][3] / avg_length
+                score = idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+                scores[docnum] = scores.get(docnum, 0.0) + weight * score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self._docs[item[0]][0]))[:top_k]
+        return [
+            {"id": self._docs[docnum][0], "title": self._docs[docnum][1],
+             "url": self._docs[docnum][2], "score": round(score, 4)}
+            for docnum, score in ranked
+        ]
+
+    def _iter_postings(self, term: str) -> Iterator[Tuple[int, int]]:
+        entry = self._lexicon.get(term)
+        if entry is not None:
+            offset, count = entry
+            pairs = self._postings[offset * 2:(offset + count) * 2]
+            for i in range(0, len(pairs), 2):
+                yield pairs[i], pairs[i + 1]
+        yield from self._delta.get(term, {}).items()
+
+    # --- PERSISTENCE ---
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Compacts both segments into a fresh index file and memory-maps it."""
+        path = path or self.index_path
+        with self._lock:
+            merged: Dict[str, List[Tuple[int, int]]] = {}
+            for term in set(self._lexicon) | set(self._delta):
+                live = [(docnum, tf) for docnum, tf in self._iter_postings(term)
+                        if docnum not in self._tombstones]
+                if live:
+                    merged[term] = live
+
+            # Renumber live documents densely
+            renumber = {}
+            docs = []
+            for docnum, doc in enumerate(self._docs):
+                if doc is not None:
+                    renumber[docnum] = len(docs)
+                    docs.append(doc)
+
+            postings = array('I')
+            lexicon = {}
+            for term in sorted(merged):
+                lexicon[term] = [len(postings) // 2, len(merged[term])]
+                for docnum, tf in sorted(merged[term]):
+                    postings.append(renumber[docnum])
+                    postings.append(tf)
+
+            header = json.dumps({
+                "byteorder": sys.byteorder,
+                "docs": docs,
+                "lexicon": lexicon,
+            }).encode("utf-8")
+            header += b" " * (-len(header) % 4)  # keep the postings 4-byte aligned
+
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(_MAGIC)
+                file.write(struct.pack("<I", len(header)))
+                file.write(header)
+                postings.tofile(file)
+            self.close()
+            os.replace(tmp_path, path)
+            self._load(path)
+
+    def _load(self, path: str) -> None:
+        self.close()
+        file = open(path, 'rb')
+        if file.read(4) != _MAGIC:
+            file.close()
+            raise ValueError(f"Not a knowledge base index: {path}")
+        (header_length,) = struct.unpack("<I", file.read(4))
+        header = json.loads(file.read(header_length))
+        if header["byteorder"] != sys.byteorder:
+            file.close()
+            raise ValueError(f"Index {path} was written on a {header['byteorder']}-endian machine")
+
+        start = 8 + header_length
+        if os.path.getsize(path) > start:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._postings = memoryview(self._mmap)[start:].cast('I')
+        else:
+            self._postings = memoryview(array('I'))
+        self._file = file
+
+        self._docs = header["docs"]
+        self._docnum_by_id = {doc[0]: docnum for docnum, doc in enumerate(self._docs)}
+        self._total_length = sum(doc[3] for doc in self._docs)
+        self._lexicon = {term: tuple(entry) for term, entry in header["lexicon"].items()}
+        self._delta = {}
+        self._tombstones = set()
+        self._cache.clear()
+
+
+class KnowledgeBaseHandle:
+    """
+    A knowledge base described by the `knowledge_base` section of agent_config.yaml,
+    opened on the first `get()`. Relative paths are resolved against `base_dir`.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, base_dir: str = "."):
+        settings = dict(settings or {})
+        self.top_k = settings.pop("top_k", 3)
+        for key in ("articles_dir", "index_path"):
+            if settings.get(key):
+                settings[key] = os.path.join(base_dir, settings[key])
+        settings.setdefault("articles_dir", os.path.join(os.path.dirname(__file__), "config", "kb"))
+        self.settings = settings
+        self._kb: Optional[KnowledgeBase] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> KnowledgeBase:
+        if self._kb is None:
+            with self._lock:
+                if self._kb is None:
+                    self._kb = KnowledgeBase(**self.settings).open()
+        return self._kb
+
+    def close(self) -> None:
+        with self._lock:
+            kb, self._kb = self._kb, None
+        if kb is not None:
+            kb.close()
+
+
+_default = KnowledgeBaseHandle()
+_default_lock = threading.Lock()
+
+
+def configure_knowledge_base(settings: Dict[str, Any], base_dir: str = ".") -> None:
+    """
+    Sets the module-wide knowledge base used by abilities called without one (e.g.
+    by `mcp_server`). Agents open their own `KnowledgeBaseHandle` and bind it instead.
+    """
+    global _default
+    handle = KnowledgeBaseHandle(settings, base_dir)
+    with _default_lock:
+        if (handle.settings, handle.top_k) != (_default.settings, _default.top_k):
+            _default, previous = handle, _default
+            previous.close()
+
+
+def default_knowledge_base() -> KnowledgeBaseHandle:
+    return _default
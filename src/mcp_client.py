@@ -1,13 +1,39 @@
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, List, Optional
+import asyncio
+import contextvars
+import functools
+import inspect
+import time
 from .state import SupportState
+from .tracing import logger
 from .abilities import common_abilities, atlas_abilities
+from .batching import BatchDispatcher
+from .transports import InProcessTransport, create_transport
 
 
 class MCPClient:
-    """Mock MCP Client for ability execution"""
+    """
+    MCP Client for ability execution. Each server type is reached through a
+    transport: in-process by default, or a remote MCP server over HTTP or stdio
+    as configured in the `servers` section of agent_config.yaml.
 
-    def __init__(self):
+    `resources` are the objects in-process abilities work with (e.g. the agent's
+    `scanner`). Each is bound once, as a keyword argument, to every ability that
+    takes a parameter of that name; abilities called without them fall back to
+    module-wide defaults.
+    """
+
+    def __init__(self, metrics=None, caches: Optional[Dict[str, Any]] = None,
+                 servers: Optional[Dict[str, Dict[str, Any]]] = None,
+                 batching: Optional[Dict[str, Any]] = None,
+                 resources: Optional[Dict[str, Any]] = None):
+        # Optional collector with a `record_ability(name, server, seconds, error)` method
+        self.metrics = metrics
+        # Optional per-ability result caches (see `ability_cache.build_ability_caches`)
+        self.caches = caches or {}
         self.common_abilities = {
+            "scan_keywords": common_abilities.scan_keywords,
+            "remember_resolution": common_abilities.remember_resolution,
             "parse_request_text": common_abilities.parse_request_text,
             "normalize_fields": common_abilities.normalize_fields,
             "add_flags_calculations": common_abilities.add_flags_calculations,
@@ -28,20 +54,193 @@ class MCPClient:
             "trigger_notifications": atlas_abilities.trigger_notifications
         }
 
-    def execute_ability(self, ability_name: str, state: SupportState, server_type: str) -> Dict[str, Any]:
-        """Execute ability through appropriate MCP server"""
+        # Vectorized signatures used when calls are coalesced across tickets
+        self.batch_abilities = {
+            "enrich_records": atlas_abilities.enrich_records_batch,
+            "knowledge_base_search": atlas_abilities.knowledge_base_search_batch,
+            "update_ticket": atlas_abilities.update_ticket_batch,
+            "trigger_notifications": atlas_abilities.trigger_notifications_batch,
+            "response_generation": common_abilities.response_generation_batch
+        }
+
+        if resources:
+            for abilities in (self.common_abilities, self.atlas_abilities, self.batch_abilities):
+                abilities.update({name: bind_resources(func, resources) for name, func in abilities.items()})
+
+        servers = servers or {}
+        self.transports = {
+            "COMMON": create_transport(servers.get("COMMON") or {}, self.common_abilities),
+            "ATLAS": create_transport(servers.get("ATLAS") or {}, self.atlas_abilities),
+        }
+
+        # Optional cross-ticket micro-batching (the `batching` config section)
+        batching = batching or {}
+        self.batched = set(batching.get('abilities', [])) if batching.get('enabled') else set()
+        self.batcher = BatchDispatcher(
+            self._run_batch,
+            window=batching.get('window_ms', 5) / 1000,
+            max_batch_size=batching.get('max_batch_size', 64),
+        ) if self.batched else None
+
+    def resolve_ability(self, ability_name: str, server_type: str) -> Callable:
+        """Look up the function implementing an ability on the given server"""
+        transport = self.transports.get(server_type)
+        if transport is None:
+            raise ValueError(f"Unknown server type: {server_type}")
+
+        ability_func = transport.resolve(ability_name)
+        if not ability_func:
+            raise ValueError(f"Ability not found: {ability_name}")
+        return ability_func
+
+    def bind_ability(self, ability_name: str, server_type: str) -> "BoundAbility":
+        """Resolves an ability once (raising ValueError if it does not exist) for repeated calls."""
+        return BoundAbility(self, ability_name, server_type, self.resolve_ability(ability_name, server_type))
+
+    def execute_ability(self, ability_name: str, state: SupportState, server_type: str,
+                        ability_func: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        Execute ability through appropriate MCP server. `ability_func` skips the
+        lookup when the implementation was already resolved (see `bind_ability`).
+        """
+        cache = self.caches.get(ability_name) if self.caches else None
+        if cache is None:
+            return self._execute(ability_name, state, server_type, ability_func)
+
+        hit, result = cache.get(state)
+        if not hit:
+            result = self._execute(ability_name, state, server_type, ability_func)
+            # An empty result means the call failed; don't remember failures
+            if result:
+                cache.put(state, result)
+        return result
+
+    def _execute(self, ability_name: str, state: SupportState, server_type: str,
+                 ability_func: Optional[Callable]) -> Dict[str, Any]:
+        if self.metrics is not None:
+            return self._execute_timed(ability_name, state, server_type, ability_func)
         try:
-            if server_type == "COMMON":
-                ability_func = self.common_abilities.get(ability_name)
-            elif server_type == "ATLAS":
-                ability_func = self.atlas_abilities.get(ability_name)
-            else:
-                raise ValueError(f"Unknown server type: {server_type}")
+            return self._call(ability_name, state, server_type, ability_func)
+        except Exception as e:
+            logger.error("Error executing %s: %s", ability_name, e)
+            return {}
+
+    def _execute_timed(self, ability_name: str, state: SupportState, server_type: str,
+                       ability_func: Optional[Callable]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = self._call(ability_name, state, server_type, ability_func)
+        except Exception as e:
+            self.metrics.record_ability(ability_name, server_type, time.perf_counter() - started, error=True)
+            logger.error("Error executing %s: %s", ability_name, e)
+            return {}
+        self.metrics.record_ability(ability_name, server_type, time.perf_counter() - started)
+        return result
+
+    def _call(self, ability_name: str, state: SupportState, server_type: str,
+              ability_func: Optional[Callable]) -> Dict[str, Any]:
+        if ability_name in self.batched:
+            return self.batcher.submit(ability_name, server_type, state).result()
+        return (ability_func or self.resolve_ability(ability_name, server_type))(state)
+
+    def _run_batch(self, ability_name: str, server_type: str, states: List[SupportState]) -> List[Any]:
+        """
+        Runs one coalesced batch: the vectorized ability in-process, a pipelined
+        call_many remotely. A call that fails is returned as its exception, so it
+        fails only its own ticket; if the vectorized ability raises, the calls are
+        retried one by one to find the failing one.
+        """
+        transport = self.transports[server_type]
+        if not isinstance(transport, InProcessTransport):
+            return transport.call_many([(ability_name, state) for state in states], return_exceptions=True)
+        batch_func = self.batch_abilities.get(ability_name)
+        if batch_func is not None:
+            try:
+                return batch_func(states)
+            except Exception as e:
+                logger.warning("Batch of %s failed (%s); running its %s calls one by one", ability_name, e, len(states))
+        ability_func = self.resolve_ability(ability_name, server_type)
+        results = []
+        for state in states:
+            try:
+                results.append(ability_func(state))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def aexecute_ability(self, ability_name: str, state: SupportState, server_type: str,
+                               ability_func: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        Async variant of `execute_ability`. Coroutine abilities are awaited directly,
+        plain functions run in the event loop's default executor so a slow call
+        does not block other tickets.
+        """
+        cache = self.caches.get(ability_name) if self.caches else None
+        if cache is None:
+            return await self._aexecute(ability_name, state, server_type, ability_func)
 
-            if ability_func:
-                return ability_func(state)
+        hit, result = cache.get(state)
+        if not hit:
+            result = await self._aexecute(ability_name, state, server_type, ability_func)
+            if result:
+                cache.put(state, result)
+        return result
+
+    async def _aexecute(self, ability_name: str, state: SupportState, server_type: str,
+                        ability_func: Optional[Callable]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            ability_func = ability_func or self.resolve_ability(ability_name, server_type)
+            if ability_name in self.batched:
+                result = await asyncio.wrap_future(self.batcher.submit(ability_name, server_type, state))
+            elif inspect.iscoroutinefunction(ability_func):
+                result = await ability_func(state)
             else:
-                raise ValueError(f"Ability not found: {ability_name}")
+                loop = asyncio.get_running_loop()
+                # Carry the ticket/stage log context over to the executor thread
+                call = functools.partial(contextvars.copy_context().run, ability_func, state)
+                result = await loop.run_in_executor(None, call)
         except Exception as e:
-            print(f"Error executing {ability_name}: {str(e)}")
-            return {}
\ No newline at end of file
+            if self.metrics is not None:
+                self.metrics.record_ability(ability_name, server_type, time.perf_counter() - started, error=True)
+            logger.error("Error executing %s: %s", ability_name, e)
+            return {}
+        if self.metrics is not None:
+            self.metrics.record_ability(ability_name, server_type, time.perf_counter() - started)
+        return result
+
+    def close(self) -> None:
+        """Flushes pending batches, closes pooled connections and stops server subprocesses."""
+        if self.batcher is not None:
+            self.batcher.close()
+        for transport in self.transports.values():
+            transport.close()
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss statistics for every cached ability."""
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+
+def bind_resources(func: Callable, resources: Dict[str, Any]) -> Callable:
+    """`func` with the `resources` it has parameters for passed as keyword arguments."""
+    parameters = inspect.signature(func).parameters
+    kwargs = {name: value for name, value in resources.items() if name in parameters}
+    return functools.partial(func, **kwargs) if kwargs else func
+
+
+class BoundAbility:
+    """An ability resolved to its implementation at load time, called with a ticket's state."""
+
+    __slots__ = ("client", "name", "server_type", "func")
+
+    def __init__(self, client: MCPClient, name: str, server_type: str, func: Callable):
+        self.client = client
+        self.name = name
+        self.server_type = server_type
+        self.func = func
+
+    def __call__(self, state: SupportState) -> Dict[str, Any]:
+        return self.client.execute_ability(self.name, state, self.server_type, self.func)
+
+    async def acall(self, state: SupportState) -> Dict[str, Any]:
+        return await self.client.aexecute_ability(self.name, state, self.server_type, self.func)
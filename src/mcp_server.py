@@ -0,0 +1,149 @@
+"""
+A minimal MCP server exposing one server type's abilities over JSON-RPC, for
+running the agent against a real remote transport without external services:
+
+    python -m src.mcp_server --server ATLAS --http 8765
+    python -m src.mcp_server --server ATLAS --stdio
+
+Each ability is a tool taking the ticket `state` and returning its result dict
+as `structuredContent`. Requests are served concurrently, so stdio responses may
+come back out of order (clients match them by id).
+"""
+from typing import Dict, Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import sys
+import threading
+
+from .mcp_client import MCPClient
+from .tracing import configure_logging, logger
+from .transports import MCP_PROTOCOL_VERSION
+
+
+class AbilityServer:
+    """Dispatches JSON-RPC messages to a table of ability functions."""
+
+    def __init__(self, abilities: Dict[str, Callable], name: str):
+        self.abilities = abilities
+        self.name = name
+
+    def handle(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Returns the response to `message`, or None for a notification."""
+        if "id" not in message:
+            return None
+        method = message.get("method")
+        params = message.get("params") or {}
+        if method == "initialize":
+            result = {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": self.name, "version": "1.0"},
+            }
+        elif method == "tools/list":
+            result = {"tools": [{"name": name, "inputSchema": {"type": "object"}} for name in self.abilities]}
+        elif method == "tools/call":
+            ability = self.abilities.get(params.get("name"))
+            if ability is None:
+                return _error(message["id"], -32602, f"Unknown tool: {params.get('name')}")
+            try:
+                output = ability(params.get("arguments", {}).get("state", {}))
+                result = {"content": [{"type": "text", "text": json.dumps(output, default=str)}],
+                          "structuredContent": output}
+            except Exception as e:
+                logger.error("Error executing %s: %s", params.get("name"), e)
+                result = {"content": [{"type": "text", "text": str(e)}], "isError": True}
+        else:
+            return _error(message["id"], -32601, f"Method not found: {method}")
+        return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+    def handle_payload(self, payload: Any) -> Any:
+        """Handles a single message or a JSON-RPC batch."""
+        if isinstance(payload, list):
+            responses = [response for response in map(self.handle, payload) if response is not None]
+            return responses or None
+        return self.handle(payload)
+
+
+def _error(message_id: Any, code: int, text: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": message_id, "error": {"code": code, "message": text}}
+
+
+def serve_stdio(server: AbilityServer, workers: int = 16) -> None:
+    write_lock = threading.Lock()
+
+    def respond(message: Dict[str, Any]) -> None:
+        response = server.handle(message)
+        if response is not None:
+            with write_lock:
+                sys.stdout.write(json.dumps(response, default=str) + "\n")
+                sys.stdout.flush()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for line in sys.stdin:
+            if line.strip():
+                pool.submit(respond, json.loads(line))
+
+
+def serve_http(server: AbilityServer, host: str, port: int) -> None:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep connections alive for pooled clients
+        disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                response = server.handle_payload(json.loads(body))
+            except json.JSONDecodeError as e:
+                response = _error(None, -32700, f"Parse error: {e}")
+            if response is None:
+                self.send_response(202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            data = json.dumps(response, default=str).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    logger.info("MCP server %s listening on http://%s:%d", server.name, host, port)
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the agent's abilities as an MCP server.")
+    parser.add_argument("--server", choices=["COMMON", "ATLAS"], default="ATLAS")
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument("--stdio", action="store_true", help="Speak JSON-RPC on stdin/stdout")
+    transport.add_argument("--http", type=int, metavar="PORT", help="Serve JSON-RPC over HTTP on PORT")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--log-file", help="Write JSON logs here (stdio mode is otherwise silent)")
+    args = parser.parse_args()
+
+    if args.log_file:
+        configure_logging("json", path=args.log_file)
+    elif args.stdio:
+        # stdout carries the protocol, so logs must go elsewhere
+        configure_logging("quiet")
+
+    client = MCPClient()
+    abilities = client.common_abilities if args.server == "COMMON" else client.atlas_abilities
+    server = AbilityServer(abilities, name=f"langie-{args.server.lower()}")
+    if args.stdio:
+        serve_stdio(server)
+    else:
+        serve_http(server, args.host, args.http)
+
+
+if __name__ == "__main__":
+    main()
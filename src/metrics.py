@@ -0,0 +1,221 @@
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import functools
+import inspect
+import json
+import threading
+import time
+
+
+class Histogram:
+    """
+    HDR-style latency histogram. Values are recorded in microseconds into
+    log-linear buckets: each power of two is split into 2**precision_bits
+    sub-buckets, which bounds the relative error of any percentile to
+    about 1 / 2**precision_bits regardless of the value range.
+    """
+
+    def __init__(self, precision_bits: int = 7):
+        self.precision_bits = precision_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def _bucket(self, micros: int) -> int:
+        shift = max(0, micros.bit_length() - self.precision_bits - 1)
+        return (shift << self.precision_bits) + (micros >> shift)
+
+    def _bucket_upper(self, index: int) -> int:
+        shift = max(0, (index >> self.precision_bits) - 1)
+        sub = index - (shift << self.precision_bits)
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        micros = int(seconds * 1_000_000)
+        index = self._bucket(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> float:
+        """Returns the value (in seconds) at or below which `p` percent of samples fall."""
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(self.count * p / 100.0)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return max(self.min, min(self._bucket_upper(index) / 1_000_000, self.max))
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+
+class _Series:
+    """Latency histogram plus counters for one stage or ability."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = 0
+        self.state_keys_delta = 0
+
+
+class Metrics:
+    """
+    Thread-safe collector for per-stage and per-ability timings. Pass an instance
+    to `LangGraphAgent(metrics=...)`; any object with the same `record_stage` and
+    `record_ability` methods can be plugged in instead. When no collector is given
+    the agent does not wrap anything, so disabled instrumentation costs nothing.
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, _Series] = {}
+        self.abilities: Dict[Tuple[str, str], _Series] = {}
+
+    def record_stage(self, stage: str, seconds: float, error: bool = False, state_keys_delta: int = 0) -> None:
+        with self._lock:
+            series = self.stages.get(stage)
+            if series is None:
+                series = self.stages[stage] = _Series()
+            series.latency.record(seconds)
+            series.calls += 1
+            series.errors += error
+            series.state_keys_delta += state_keys_delta
+
+    def record_ability(self, ability: str, server: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            key = (ability, server)
+            series = self.abilities.get(key)
+            if series is None:
+                series = self.abilities[key] = _Series()
+            series.latency.record(seconds)
+            series.calls += 1
+            series.errors += error
+
+    def snapshot(self) -> Dict[str, Any]:
+        """A JSON-serializable view of everything recorded so far."""
+        with self._lock:
+            return {
+                "stages": {
+                    name: {
+                        "calls": s.calls,
+                        "errors": s.errors,
+                        "state_keys_delta": s.state_keys_delta,
+                        "latency_seconds": s.latency.summary(),
+                    }
+                    for name, s in self.stages.items()
+                },
+                "abilities": {
+                    name: {
+                        "server": server,
+                        "calls": s.calls,
+                        "errors": s.errors,
+                        "latency_seconds": s.latency.summary(),
+                    }
+                    for (name, server), s in self.abilities.items()
+                },
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            self._render_family(lines, "langie_stage", "Stage", [
+                ({"stage": name}, s) for name, s in sorted(self.stages.items())
+            ])
+            self._render_family(lines, "langie_ability", "Ability", [
+                ({"ability": name, "server": server}, s)
+                for (name, server), s in sorted(self.abilities.items())
+            ])
+            lines.append("# HELP langie_stage_state_keys_delta Net state keys added by the stage.")
+            lines.append("# TYPE langie_stage_state_keys_delta counter")
+            for name, s in sorted(self.stages.items()):
+                lines.append(f'langie_stage_state_keys_delta{{stage="{name}"}} {s.state_keys_delta}')
+        return "\n".join(lines) + "\n"
+
+    def _render_family(self, lines: List[str], prefix: str, label: str, series: List[Tuple[Dict[str, str], _Series]]) -> None:
+        lines.append(f"# HELP {prefix}_latency_seconds {label} wall time.")
+        lines.append(f"# TYPE {prefix}_latency_seconds summary")
+        for labels, s in series:
+            base = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            for q in self.QUANTILES:
+                lines.append(f'{prefix}_latency_seconds{{{base},quantile="{q}"}} {s.latency.percentile(q * 100):.6f}')
+            lines.append(f"{prefix}_latency_seconds_sum{{{base}}} {s.latency.total:.6f}")
+            lines.append(f"{prefix}_latency_seconds_count{{{base}}} {s.latency.count}")
+        for metric, attr, help_text in (("calls_total", "calls", "calls"), ("errors_total", "errors", "failed calls")):
+            lines.append(f"# HELP {prefix}_{metric} {label} {help_text}.")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for labels, s in series:
+                base = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{prefix}_{metric}{{{base}}} {getattr(s, attr)}")
+
+    def write(self, path: str) -> None:
+        """Writes a snapshot to `path`: Prometheus text for `.prom`/`.txt`, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, 'w') as file:
+            file.write(text)
+
+
+def _populated(state: Optional[Dict[str, Any]]) -> set:
+    return {key for key, value in state.items() if value is not None} if state else set()
+
+
+def _added(before: set, result: Optional[Dict[str, Any]]) -> int:
+    """Keys a stage populated, whether it returned the whole state or only its changes."""
+    return len(_populated(result) - before)
+
+
+def instrument_stage(metrics: Optional[Metrics], stage: str, func: Callable) -> Callable:
+    """
+    Wraps a stage node so its wall time, failures and state growth are recorded.
+    Returns `func` untouched when `metrics` is None. Works for sync and async stages.
+    """
+    if metrics is None:
+        return func
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(state):
+            before = _populated(state)
+            started = time.perf_counter()
+            try:
+                result = await func(state)
+            except Exception:
+                metrics.record_stage(stage, time.perf_counter() - started, error=True)
+                raise
+            metrics.record_stage(stage, time.perf_counter() - started, state_keys_delta=_added(before, result))
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(state):
+        before = _populated(state)
+        started = time.perf_counter()
+        try:
+            result = func(state)
+        except Exception:
+            metrics.record_stage(stage, time.perf_counter() - started, error=True)
+            raise
+        metrics.record_stage(stage, time.perf_counter() - started, state_keys_delta=_added(before, result))
+        return result
+    return wrapper
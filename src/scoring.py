@@ -0,0 +1,174 @@
+"""
+Solution scoring and the escalation threshold, shared by the per-ticket DECIDE
+abilities and a columnar batch path for re-scoring many tickets at once:
+
+    python -m src.scoring open_tickets.jsonl
+    python -m src.scoring open_tickets.jsonl --grid technical_weight=3,5,7 --grid escalation_threshold=85,90
+
+The batch path needs the optional `numpy` package.
+"""
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import argparse
+import itertools
+
+from .keyword_scanner import get_scanner
+
+# Used for any key missing from the `scoring` section of agent_config.yaml
+DEFAULT_SCORING: Dict[str, Any] = {
+    "base_score": 100,
+    "very_short_length": 20,    # queries shorter than this lose very_short_penalty
+    "very_short_penalty": 40,
+    "short_length": 50,         # ... shorter than this lose short_penalty
+    "short_penalty": 20,
+    "long_length": 100,         # ... longer than this lose long_penalty
+    "long_penalty": 10,
+    "technical_weight": 5,      # per distinct technical term
+    "urgency_weight": 3,        # per distinct urgency term
+    "min_score": 50,
+    "max_score": 100,
+    "escalation_threshold": 90,  # escalate when the score is below this
+}
+
+_weights: Dict[str, Any] = dict(DEFAULT_SCORING)
+
+
+def configure_scoring(settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Sets the module-wide weights used when none are passed in, from the `scoring`
+    section of agent_config.yaml. Agents bind their own weights to the abilities.
+    """
+    global _weights
+    _weights = {**DEFAULT_SCORING, **(settings or {})}
+    return _weights
+
+
+def scoring_weights() -> Dict[str, Any]:
+    return _weights
+
+
+def score_query(query_length: int, technical_count: int, urgency_count: int,
+                weights: Optional[Dict[str, Any]] = None) -> int:
+    """Scores one query from its length and keyword counts."""
+    w = weights or _weights
+    score = w["base_score"]
+    if query_length < w["very_short_length"]:
+        score -= w["very_short_penalty"]
+    elif query_length < w["short_length"]:
+        score -= w["short_penalty"]
+    elif query_length > w["long_length"]:
+        score -= w["long_penalty"]
+    score -= technical_count * w["technical_weight"]
+    score -= urgency_count * w["urgency_weight"]
+    return max(w["min_score"], min(w["max_score"], score))
+
+
+def needs_escalation(score: float, weights: Optional[Dict[str, Any]] = None) -> bool:
+    return score < (weights or _weights)["escalation_threshold"]
+
+
+# --- BATCH SCORING ---
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('Batch scoring needs numpy: pip install numpy')
+    return numpy
+
+
+def score_features(queries: Iterable[str], hits: Optional[Iterable[Dict[str, List[str]]]] = None):
+    """
+    Extracts the scoring inputs for many queries as columns: query lengths and
+    technical/urgency term counts. Pass the tickets' `keyword_hits` if they were
+    already scanned.
+    """
+    np = _numpy()
+    queries = list(queries)
+    if hits is None:
+        scanner = get_scanner()
+        hits = (scanner.scan(query) for query in queries)
+    hits = list(hits)
+    return {
+        "length": np.fromiter((len(query) for query in queries), dtype=np.int64, count=len(queries)),
+        "technical": np.fromiter((len(h.get("technical", [])) for h in hits), dtype=np.int64, count=len(hits)),
+        "urgency": np.fromiter((len(h.get("urgency", [])) for h in hits), dtype=np.int64, count=len(hits)),
+    }
+
+
+def score_columns(features: Dict[str, Any], weights: Optional[Dict[str, Any]] = None) -> Tuple[Any, Any]:
+    """
+    Vectorized `score_query` + `needs_escalation`: returns (scores, escalate)
+    arrays equal element-wise to the per-ticket functions.
+    """
+    np = _numpy()
+    w = {**DEFAULT_SCORING, **(weights or _weights)}
+    length = features["length"]
+    penalty = np.select(
+        [length < w["very_short_length"], length < w["short_length"], length > w["long_length"]],
+        [w["very_short_penalty"], w["short_penalty"], w["long_penalty"]],
+        default=0,
+    )
+    scores = (w["base_score"] - penalty
+              - features["technical"] * w["technical_weight"]
+              - features["urgency"] * w["urgency_weight"])
+    scores = np.clip(scores, w["min_score"], w["max_score"])
+    return scores, scores < w["escalation_threshold"]
+
+
+def score_batch(queries: Iterable[str], weights: Optional[Dict[str, Any]] = None,
+                hits: Optional[Iterable[Dict[str, List[str]]]] = None) -> Tuple[Any, Any]:
+    """Scores N queries at once; returns (scores, escalate) arrays."""
+    return score_columns(score_features(queries, hits), weights)
+
+
+def score_grid(queries: Iterable[str], grid: Dict[str, List[Any]],
+               weights: Optional[Dict[str, Any]] = None,
+               hits: Optional[Iterable[Dict[str, List[str]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Re-scores the same queries for every combination of the `grid` parameter
+    values (applied over `weights`). Features are extracted once.
+    """
+    features = score_features(queries, hits)
+    base = {**DEFAULT_SCORING, **(weights or _weights)}
+    names = list(grid)
+    results = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        scores, escalate = score_columns(features, {**base, **params})
+        results.append({"params": params, "scores": scores, "escalate": escalate})
+    return results
+
+
+def main():
+    import yaml
+    from .keyword_scanner import configure_scanner
+    from .ticket_io import read_jsonl
+
+    parser = argparse.ArgumentParser(description="Re-score tickets and report the escalation rate.")
+    parser.add_argument("tickets", help="JSONL file of tickets")
+    parser.add_argument("--config", default="src/config/agent_config.yaml")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="Scoring parameter values to sweep (repeatable)")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as file:
+        config = yaml.safe_load(file)
+    configure_scanner(config.get('vocabularies'))
+    weights = configure_scoring(config.get('scoring'))
+
+    grid = {}
+    for spec in args.grid:
+        name, _, values = spec.partition("=")
+        if name not in DEFAULT_SCORING:
+            parser.error(f"Unknown scoring parameter: {name}")
+        grid[name] = [float(value) if "." in value else int(value) for value in values.split(",")]
+
+    queries = [ticket["query"] for ticket in read_jsonl(args.tickets)]
+    for result in score_grid(queries, grid, weights):
+        escalated = int(result["escalate"].sum())
+        print(f"{result['params'] or 'config'}: mean score {result['scores'].mean():.2f}, "
+              f"escalated {escalated}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,11 @@ class SupportState(TypedDict):
     query: str
     priority: Priority
     ticket_id: str
+    language: Optional[str]
 
     # Additional state accumulated through stages
+    keyword_hits: Optional[Dict[str, List[str]]]
+    duplicate_of: Optional[str]
     structured_data: Optional[Dict[str, Any]]
     extracted_entities: Optional[Dict[str, Any]]
     normalized_fields: Optional[Dict[str, Any]]
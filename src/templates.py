@@ -0,0 +1,190 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import os
+import string
+import threading
+import time
+
+from .state import SupportState
+from .tracing import logger
+
+# Used when agent_config.yaml has no `responses` section; matches the original reply text
+DEFAULT_TEMPLATES = {
+    "en": {
+        "escalated": {
+            "default": (
+                "Dear {customer_name},\n\n"
+                "Thank you for contacting support. We have escalated your request.\n\n"
+                "Query: {query:.100}...\n"
+                "Your issue has been assigned to a specialist for further investigation.\n\n"
+                "Best regards,\nSupport Team"
+            ),
+        },
+        "resolved": {
+            "default": (
+                "Dear {customer_name},\n\n"
+                "Thank you for contacting support. We have processed your request.\n\n"
+                "Query: {query:.100}...\n"
+                "Your issue has been resolved.\n\n"
+                "Best regards,\nSupport Team"
+            ),
+        },
+    },
+}
+
+OUTCOMES = ("escalated", "resolved")
+DEFAULT_TIER = "default"
+
+_FIELDS = frozenset(SupportState.__annotations__)
+_formatter = string.Formatter()
+
+
+def compile_template(text: str) -> Tuple[Tuple[str, Optional[str], str], ...]:
+    """
+    Parses a template once into (literal, field, format_spec) parts. Fields are
+    top-level state keys with an optional format spec, e.g. `{query:.100}` for the
+    first 100 characters. Raises ValueError for unknown fields or unsupported syntax.
+    """
+    parts = []
+    for literal, field, spec, conversion in _formatter.parse(text):
+        if field is not None:
+            if field not in _FIELDS:
+                raise ValueError(f"Unknown field {{{field}}} in response template")
+            if conversion or "{" in spec:
+                raise ValueError(f"Unsupported placeholder {{{field}}} in response template")
+        parts.append((literal, field, spec or ""))
+    return tuple(parts)
+
+
+class CompiledTemplates:
+    """An immutable set of compiled templates keyed by (language, outcome, tier)."""
+
+    def __init__(self, templates: Dict[str, Any], default_language: str = "en"):
+        self.default_language = default_language
+        self.templates = {
+            (language, outcome, tier): compile_template(text)
+            for language, outcomes in templates.items()
+            for outcome, tiers in outcomes.items()
+            for tier, text in tiers.items()
+        }
+        for outcome in OUTCOMES:
+            if (default_language, outcome, DEFAULT_TIER) not in self.templates:
+                raise ValueError(f"Response templates need a `{DEFAULT_TIER}` {outcome} template for {default_language!r}")
+        self._resolved: Dict[Tuple[str, str, str], tuple] = {}
+
+    def select(self, language: str, outcome: str, tier: str) -> tuple:
+        """The template for a ticket, falling back to the default tier and then the default language."""
+        key = (language, outcome, tier)
+        template = self._resolved.get(key)
+        if template is None:
+            for candidate in (key, (language, outcome, DEFAULT_TIER),
+                              (self.default_language, outcome, tier),
+                              (self.default_language, outcome, DEFAULT_TIER)):
+                template = self.templates.get(candidate)
+                if template is not None:
+                    break
+            self._resolved[key] = template
+        return template
+
+
+class ResponseTemplates:
+    """
+    Renders customer replies from compiled templates.
+
+    The template is chosen by outcome (escalated or resolved), the customer tier
+    from `enriched_data` and the ticket's `language`. Replies are built in a
+    per-thread buffer that is reused across renders. When `config_path` is set, its
+    mtime is checked at most every `reload_interval` seconds and changed templates
+    are recompiled in place; a broken edit is logged and the old templates kept.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, config_path: Optional[str] = None):
+        settings = settings or {}
+        self.reload_interval = settings.get('reload_interval', 1.0)
+        # `reload_interval: null` turns hot reload off
+        self.config_path = config_path if self.reload_interval is not None else None
+        self.compiled = self._compile(settings)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._mtime = self._stat()
+
+    @staticmethod
+    def _compile(settings: Dict[str, Any]) -> CompiledTemplates:
+        return CompiledTemplates(settings.get('templates') or DEFAULT_TEMPLATES,
+                                 settings.get('default_language', 'en'))
+
+    def _stat(self) -> Optional[int]:
+        if self.config_path is None:
+            return None
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = now
+            mtime = self._stat()
+            if mtime is None or mtime == self._mtime:
+                return
+            self._mtime = mtime
+            from .config_loader import load_config
+            try:
+                config, _ = load_config(self.config_path)
+                self.compiled = self._compile(config.get('responses') or {})
+                logger.info("Response templates reloaded from %s", self.config_path)
+            except Exception as e:
+                logger.warning("Keeping previous response templates; reload failed: %s", e)
+        finally:
+            self._lock.release()
+
+    def _buffer(self) -> List[str]:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = []
+        return buffer
+
+    def _render(self, compiled: CompiledTemplates, state: Dict[str, Any], buffer: List[str]) -> str:
+        outcome = "escalated" if state.get("escalation_required") else "resolved"
+        tier = (state.get("enriched_data") or {}).get("customer_tier") or DEFAULT_TIER
+        template = compiled.select(state.get("language") or compiled.default_language, outcome, tier)
+        buffer.clear()
+        for literal, field, spec in template:
+            buffer.append(literal)
+            if field is not None:
+                value = state.get(field)
+                buffer.append(format("" if value is None else value, spec))
+        return "".join(buffer)
+
+    def render(self, state: Dict[str, Any]) -> str:
+        if self.config_path is not None:
+            self._maybe_reload()
+        return self._render(self.compiled, state, self._buffer())
+
+    def render_many(self, states: Iterable[Dict[str, Any]]) -> List[str]:
+        """Renders a batch (e.g. a bulk notification run) against one template snapshot."""
+        if self.config_path is not None:
+            self._maybe_reload()
+        compiled, buffer = self.compiled, self._buffer()
+        return [self._render(compiled, state, buffer) for state in states]
+
+
+_templates: Optional[ResponseTemplates] = None
+
+
+def configure_templates(settings: Optional[Dict[str, Any]] = None,
+                        config_path: Optional[str] = None) -> ResponseTemplates:
+    """
+    Compiles the module-wide templates used by abilities called without their own
+    (e.g. by `mcp_server`), from the `responses` section of agent_config.yaml.
+    """
+    global _templates
+    _templates = ResponseTemplates(settings, config_path=config_path)
+    return _templates
+
+
+def get_response_templates() -> ResponseTemplates:
+    return _templates or configure_templates()
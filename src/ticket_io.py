@@ -0,0 +1,23 @@
+from typing import Dict, Any, Iterable, Iterator
+import json
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Lazily yields one ticket per non-empty line of a JSONL file."""
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def write_jsonl(path: str, states: Iterable[Dict[str, Any]]) -> int:
+    """Writes final states to a JSONL file as they arrive. Returns the number written."""
+    count = 0
+    with open(path, 'w') as file:
+        for state in states:
+            # dict() also unpacks CompactState results
+            file.write(json.dumps(dict(state), default=str))
+            file.write("\n")
+            count += 1
+    return count
@@ -0,0 +1,157 @@
+from typing import Dict, Any, Optional, TextIO
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+# All stages and abilities log through this logger (or children of it)
+logger = logging.getLogger("langie")
+
+_ticket_id: contextvars.ContextVar = contextvars.ContextVar("ticket_id", default=None)
+_stage: contextvars.ContextVar = contextvars.ContextVar("stage", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_settings: Dict[str, Any] = {}
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "ticket_id", "stage"}
+
+
+def bind(ticket_id: Optional[str] = None, stage: Optional[str] = None) -> None:
+    """Tags every event logged from the current context with a ticket and/or stage."""
+    if ticket_id is not None:
+        _ticket_id.set(ticket_id)
+    if stage is not None:
+        _stage.set(stage)
+
+
+class _ContextFilter(logging.Filter):
+    """
+    Copies the bound ticket/stage onto the record. Runs on the thread that logged,
+    before the record is queued, since the context is not visible on the listener thread.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.ticket_id = _ticket_id.get()
+        record.stage = _stage.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON line: ts, level, ticket_id, stage, msg and any extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "ticket_id": getattr(record, "ticket_id", None),
+            "stage": getattr(record, "stage", None),
+            "msg": record.getMessage().strip(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                event[key] = value
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str)
+
+
+class BufferedStreamHandler(logging.Handler):
+    """Writes formatted lines in chunks instead of one write + flush per event."""
+
+    def __init__(self, stream: TextIO, batch_size: int = 256, flush_interval: float = 1.0):
+        super().__init__()
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._buffer.append(self.format(record))
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.stream.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self.stream.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+
+def configure_logging(mode: str = "console", level: str = "INFO", path: Optional[str] = None) -> None:
+    """
+    Configures the agent's trace output. Modes:
+
+    - "console": human-readable lines on stdout (the default demo output)
+    - "json": JSON lines to `path` (or stdout), written by a background thread in batches
+    - "quiet": logging disabled; a log call costs one attribute check
+    """
+    global _listener
+    if mode not in ("console", "json", "quiet"):
+        raise ValueError(f"Unknown logging mode: {mode}")
+
+    shutdown_logging()
+    _settings.update(mode=mode, level=level, path=path)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.propagate = False
+    logger.disabled = mode == "quiet"
+    logger.setLevel(level)
+
+    if mode == "console":
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    elif mode == "json":
+        stream = open(path, 'a', buffering=1 << 16) if path else sys.stdout
+        writer = BufferedStreamHandler(stream)
+        writer.setFormatter(JsonFormatter())
+        # The caller only enqueues the record; JSON encoding and I/O happen on the listener thread
+        handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        handler.addFilter(_ContextFilter())
+        logger.addHandler(handler)
+        _listener = logging.handlers.QueueListener(handler.queue, writer)
+        _listener.start()
+
+
+def current_settings() -> Dict[str, Any]:
+    """The arguments of the last `configure_logging` call, for re-applying in child processes."""
+    return dict(_settings)
+
+
+def shutdown_logging() -> None:
+    """Stops the background writer, flushing any buffered events."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def _forget_listener_in_child() -> None:
+    # A forked child inherits the parent's unflushed buffer but not its writer thread;
+    # drop both so the parent's events are not written twice.
+    global _listener
+    if _listener is not None:
+        for handler in _listener.handlers:
+            if isinstance(handler, BufferedStreamHandler):
+                handler._buffer.clear()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_listener_in_child)
@@ -0,0 +1,342 @@
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import functools
+import http.client
+import itertools
+import json
+import queue
+import random
+import select
+import subprocess
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .tracing import logger
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+
+class MCPError(Exception):
+    """An error returned by a remote MCP server (as opposed to a transport failure)."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+
+
+class TransportError(Exception):
+    """The request could not be delivered or no response arrived in time."""
+
+
+class RequestNotSent(TransportError):
+    """The request failed before it reached the server, so sending it again is safe."""
+
+
+class InProcessTransport:
+    """Dispatches abilities to plain Python functions in this process."""
+
+    def __init__(self, abilities: Dict[str, Callable]):
+        self.abilities = abilities
+
+    def resolve(self, ability_name: str) -> Optional[Callable]:
+        return self.abilities.get(ability_name)
+
+    def close(self) -> None:
+        pass
+
+
+class RemoteTransport:
+    """
+    Base class for JSON-RPC transports to an MCP server. Abilities are invoked with
+    `tools/call`; the ticket state is passed as the tool's `state` argument and the
+    ability's result dict comes back as `structuredContent`.
+
+    Failures before a request went out are retried with exponential backoff and
+    jitter. A timeout or dropped connection after sending may mean the server already
+    ran the call, so those are retried only for abilities listed in `idempotent`.
+    Errors reported by the server are never retried.
+    """
+
+    def __init__(self, timeout: float = 10.0, retries: int = 2, backoff: float = 0.1,
+                 idempotent: Iterable[str] = ()):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.idempotent = frozenset(idempotent)
+        self._ids = itertools.count(1)
+
+    def resolve(self, ability_name: str) -> Callable:
+        return functools.partial(self.call, ability_name)
+
+    def call(self, ability_name: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        return self.call_many([(ability_name, state)])[0]
+
+    def call_many(self, calls: List[Tuple[str, Dict[str, Any]]],
+                  return_exceptions: bool = False) -> List[Any]:
+        """
+        Sends several tool calls at once (pipelined on one connection) and returns
+        their results in order. A failed call raises `MCPError`, or with
+        `return_exceptions=True` its `MCPError` takes its place in the results so
+        the other calls' results are still returned.
+        """
+        requests = [self._tool_call(name, state) for name, state in calls]
+        idempotent = all(name in self.idempotent for name, _ in calls)
+        responses = self._with_retries(requests, idempotent)
+        if not return_exceptions:
+            return [self._unwrap(response) for response in responses]
+        results = []
+        for response in responses:
+            try:
+                results.append(self._unwrap(response))
+            except MCPError as e:
+                results.append(e)
+        return results
+
+    def _tool_call(self, ability_name: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": "tools/call",
+            "params": {"name": ability_name, "arguments": {"state": state}},
+        }
+
+    def _unwrap(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        if "error" in response:
+            raise MCPError(response["error"].get("code", -32603), response["error"].get("message", "error"))
+        result = response["result"]
+        if result.get("isError"):
+            raise MCPError(-32603, result.get("content", [{}])[0].get("text", "tool error"))
+        return result.get("structuredContent", {})
+
+    def _with_retries(self, requests: List[Dict[str, Any]], idempotent: bool) -> List[Dict[str, Any]]:
+        for attempt in range(self.retries + 1):
+            try:
+                return self._send(requests)
+            except RequestNotSent:
+                if attempt == self.retries:
+                    raise
+            except (TransportError, OSError, http.client.HTTPException):
+                if not idempotent or attempt == self.retries:
+                    raise
+            time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    def _send(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class HttpTransport(RemoteTransport):
+    """
+    JSON-RPC over HTTP with a pool of persistent keep-alive connections. Several
+    calls sent together go out as one JSON-RPC batch request.
+    """
+
+    def __init__(self, url: str, pool_size: int = 8, **kwargs):
+        super().__init__(**kwargs)
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.path = parts.path or "/"
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._pool: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def _send(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        body = json.dumps(requests[0] if len(requests) == 1 else requests, default=str).encode("utf-8")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise RequestNotSent(f"No free connection to {self.host}:{self.port} within {self.timeout}s")
+        connection = None
+        try:
+            connection = self._pooled_connection()
+            try:
+                connection.request("POST", self.path, body, {"Content-Type": "application/json"})
+            except (OSError, http.client.HTTPException) as e:
+                # Connecting or writing failed, so the server never saw a whole request
+                raise RequestNotSent(f"Could not send to {self.host}:{self.port}: {e}") from e
+            response = connection.getresponse()
+            payload = response.read()
+            if response.status >= 500:
+                raise TransportError(f"HTTP {response.status} from {self.host}:{self.port}")
+            if response.status != 200:
+                raise MCPError(-32600, f"HTTP {response.status}: {payload[:200]!r}")
+            self._pool.put(connection)
+            connection = None
+        finally:
+            if connection is not None:
+                connection.close()
+            self._slots.release()
+
+        data = json.loads(payload)
+        responses = data if isinstance(data, list) else [data]
+        by_id = {response.get("id"): response for response in responses}
+        return [by_id[request["id"]] for request in requests]
+
+    def _pooled_connection(self) -> http.client.HTTPConnection:
+        while True:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                return self._connection_class(self.host, self.port, timeout=self.timeout)
+            # An idle keep-alive socket is only readable once the server has closed it
+            if connection.sock is None or not select.select([connection.sock], [], [], 0)[0]:
+                return connection
+            connection.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class StdioTransport(RemoteTransport):
+    """
+    JSON-RPC over the stdin/stdout of a server subprocess, one message per line.
+    Requests from any number of threads are multiplexed on the single pipe: each
+    is tagged with an id and a reader thread routes responses back to the waiting
+    caller, so many calls can be in flight at once.
+    """
+
+    def __init__(self, command: List[str], **kwargs):
+        super().__init__(**kwargs)
+        self.command = command
+        self._process: Optional[subprocess.Popen] = None
+        # Set once the current process has finished the `initialize` handshake
+        self._ready = threading.Event()
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        with self._lock:
+            process, ready = self._process, self._ready
+            starting = process is None or process.poll() is not None
+            if starting:
+                self._fail_pending(TransportError("MCP server process restarted"))
+                try:
+                    process = subprocess.Popen(
+                        self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+                    )
+                except OSError as e:
+                    raise RequestNotSent(f"Could not start MCP server: {e}") from e
+                self._process, self._ready = process, threading.Event()
+                ready = self._ready
+                threading.Thread(target=self._read_loop, args=(process,), daemon=True).start()
+
+        if starting:
+            # Only the caller that started the process shakes hands; the others wait on `ready`
+            handshake = {
+                "jsonrpc": "2.0", "id": next(self._ids), "method": "initialize",
+                "params": {"protocolVersion": MCP_PROTOCOL_VERSION, "capabilities": {},
+                           "clientInfo": {"name": "langie", "version": "1.0"}},
+            }
+            try:
+                self._wait(self._submit([handshake], process), [handshake])
+                self._write(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+            except (TransportError, OSError, ValueError) as e:
+                process.kill()
+                process.wait()
+                raise RequestNotSent(f"MCP server failed to initialize: {e}") from e
+            finally:
+                ready.set()
+        elif not ready.wait(self.timeout):
+            raise RequestNotSent(f"MCP server not initialized within {self.timeout}s")
+        elif process.poll() is not None:
+            raise RequestNotSent("MCP server process exited during initialization")
+        return process
+
+    def _read_loop(self, process: subprocess.Popen) -> None:
+        for line in process.stdout:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                # The caller this response was for can't be told apart, so fail them all
+                logger.warning("Unparseable line from MCP server: %.200r", line)
+                with self._lock:
+                    self._fail_pending(TransportError("Unparseable response from MCP server"))
+                continue
+            if not isinstance(message, dict):
+                continue
+            with self._lock:
+                future = self._pending.pop(message.get("id"), None)
+            if future is not None:
+                future.set_result(message)
+        with self._lock:
+            if self._process is process:
+                self._fail_pending(TransportError("MCP server process exited"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            future.set_exception(error)
+        self._pending.clear()
+
+    def _write(self, process: subprocess.Popen, message: Dict[str, Any]) -> None:
+        line = json.dumps(message, default=str) + "\n"
+        with self._lock:
+            process.stdin.write(line)
+            process.stdin.flush()
+
+    def _submit(self, requests: List[Dict[str, Any]], process: subprocess.Popen) -> List[Future]:
+        futures = []
+        with self._lock:
+            for request in requests:
+                future = Future()
+                self._pending[request["id"]] = future
+                futures.append(future)
+        try:
+            for request in requests:
+                self._write(process, request)
+        except (OSError, ValueError):
+            self._discard(requests)
+            raise
+        return futures
+
+    def _discard(self, requests: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for request in requests:
+                self._pending.pop(request["id"], None)
+
+    def _wait(self, futures: List[Future], requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        deadline = time.monotonic() + self.timeout
+        try:
+            return [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+        except FutureTimeout:
+            # Drop the abandoned futures so a late reply (or none) doesn't keep them forever
+            self._discard(requests)
+            raise TransportError(f"No response from MCP server within {self.timeout}s")
+
+    def _send(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        process = self._ensure_started()
+        try:
+            futures = self._submit(requests, process)
+        except (BrokenPipeError, ValueError) as e:
+            raise TransportError(f"MCP server pipe closed: {e}")
+        return self._wait(futures, requests)
+
+    def close(self) -> None:
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None:
+            process.stdin.close()
+            try:
+                process.wait(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def create_transport(settings: Dict[str, Any], local_abilities: Dict[str, Callable]):
+    """Builds the transport described by one entry of the `servers` config section."""
+    kind = settings.get('transport', 'inprocess')
+    options = {key: settings[key] for key in ('timeout', 'retries', 'backoff', 'idempotent') if key in settings}
+    if kind == 'inprocess':
+        return InProcessTransport(local_abilities)
+    if kind == 'http':
+        return HttpTransport(settings['url'], pool_size=settings.get('pool_size', 8), **options)
+    if kind == 'stdio':
+        return StdioTransport(settings['command'], **options)
+    raise ValueError(f"Unknown transport: {kind}")
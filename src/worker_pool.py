@@ -0,0 +1,198 @@
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+import zlib
+from . import tracing
+from .config_loader import load_config
+
+# Per-worker counter slots in the shared array
+_PROCESSED, _ERRORS, _BUSY_SECONDS = range(3)
+_NUM_COUNTERS = 3
+
+
+def _worker_main(worker_id: int, config_path: str, inbox, outbox, counters, log_settings) -> None:
+    """Worker process: compile the graph once, then process tickets until told to stop."""
+    # Ctrl-C is handled by the parent, which shuts the pool down in an orderly way
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Background log writer threads are not inherited by forked children
+    if log_settings:
+        tracing.configure_logging(**log_settings)
+
+    from .agent import LangGraphAgent, failed_state
+    agent = LangGraphAgent(config_path)
+    base = worker_id * _NUM_COUNTERS
+
+    try:
+        while True:
+            item = inbox.get()
+            if item is None:
+                break
+            seq, ticket = item
+            started = time.perf_counter()
+            try:
+                outbox.put((seq, agent.run(ticket)))
+            except Exception as e:
+                # Report the failure as this ticket's result so the rest of the stream carries on
+                tracing.logger.error("Ticket %s failed in worker %d: %s", ticket.get("ticket_id"), worker_id, e)
+                counters[base + _ERRORS] += 1
+                outbox.put((seq, failed_state(ticket, e)))
+            counters[base + _PROCESSED] += 1
+            counters[base + _BUSY_SECONDS] += time.perf_counter() - started
+    finally:
+        # Child processes exit without running atexit hooks
+        tracing.shutdown_logging()
+
+
+class WorkerPool:
+    """
+    Runs tickets across N worker processes so the CPU-bound COMMON abilities can use
+    every core. Each worker builds its own `LangGraphAgent` (and compiled graph) once.
+    Tickets are sharded by a stable hash of `ticket_id`, so the same ticket always
+    lands on the same worker. At most `max_in_flight` tickets are outstanding at a
+    time, and each worker's inbox holds at most `worker_backlog` tickets.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None,
+                 config_path: str = "src/config/agent_config.yaml",
+                 max_in_flight: Optional[int] = None, worker_backlog: int = 16):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.config_path = config_path
+        self.max_in_flight = max_in_flight or self.num_workers * worker_backlog
+        self.worker_backlog = worker_backlog
+
+        methods = mp.get_all_start_methods()
+        self._ctx = mp.get_context("fork" if "fork" in methods else "spawn")
+        self._counters = self._ctx.RawArray('d', self.num_workers * _NUM_COUNTERS)
+        self._inboxes = []
+        self._outbox = None
+        self._workers = []
+        self._started_at = None
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close(graceful=exc_type is None)
+
+    def start(self) -> None:
+        """Forks the worker processes. Called automatically by `run_stream`."""
+        if self._workers:
+            return
+        if self._ctx.get_start_method() == "fork":
+            # Import the graph runtime and write the config artifact once, here, so
+            # every forked worker inherits them instead of paying for them again
+            import langgraph.graph  # noqa: F401
+            load_config(self.config_path)
+        self._outbox = self._ctx.Queue()
+        for worker_id in range(self.num_workers):
+            inbox = self._ctx.Queue(maxsize=self.worker_backlog)
+            worker = self._ctx.Process(
+                target=_worker_main,
+                args=(worker_id, self.config_path, inbox, self._outbox, self._counters,
+                      tracing.current_settings()),
+                name=f"ticket-worker-{worker_id}",
+                daemon=True,
+            )
+            worker.start()
+            self._inboxes.append(inbox)
+            self._workers.append(worker)
+        self._started_at = time.perf_counter()
+
+    def close(self, graceful: bool = True, timeout: float = 30.0) -> None:
+        """
+        Stops the workers. A graceful close lets each worker finish the tickets already
+        in its inbox (results nobody has collected are dropped); otherwise the
+        processes are terminated immediately.
+        """
+        if graceful:
+            for inbox in self._inboxes:
+                inbox.put(None)
+            deadline = time.monotonic() + timeout
+            # A worker can't exit while its unread results are stuck in the outbox pipe,
+            # e.g. after the caller stopped iterating `run_stream` early, so drain them
+            while any(worker.is_alive() for worker in self._workers) and time.monotonic() < deadline:
+                try:
+                    self._outbox.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        for worker in self._workers:
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self._inboxes = []
+        self._workers = []
+
+    def shard_for(self, ticket_id: Any) -> int:
+        """Maps a ticket to a worker. Stable across processes and runs, unlike `hash()`."""
+        return zlib.crc32(str(ticket_id).encode("utf-8")) % self.num_workers
+
+    def run_stream(self, tickets: Iterable[Dict[str, Any]], ordered: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Streams tickets through the pool, yielding final states as they complete
+        (or in input order with `ordered=True`). Tickets are read from `tickets`
+        only when there is room in the in-flight window. A ticket whose run raised
+        yields its `failed_state` instead of stopping the stream.
+        """
+        self.start()
+        buffered: Dict[int, Dict[str, Any]] = {}
+        next_seq = 0
+        outstanding = 0
+
+        def drain() -> Iterator[Dict[str, Any]]:
+            nonlocal next_seq, outstanding
+            seq, state = self._next_result()
+            if not ordered:
+                outstanding -= 1
+                yield state
+                return
+            buffered[seq] = state
+            while next_seq in buffered:
+                outstanding -= 1
+                yield buffered.pop(next_seq)
+                next_seq += 1
+
+        for seq, ticket in enumerate(tickets):
+            while outstanding >= self.max_in_flight:
+                yield from drain()
+            # Blocks while the target worker's inbox is full
+            self._inboxes[self.shard_for(ticket.get("ticket_id"))].put((seq, ticket))
+            outstanding += 1
+
+        while outstanding:
+            yield from drain()
+
+    def run_batch(self, tickets: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Runs a batch of tickets through the pool and returns results in input order."""
+        return list(self.run_stream(tickets, ordered=True))
+
+    def _next_result(self):
+        """Waits for the next result, failing fast if a worker process died."""
+        while True:
+            try:
+                return self._outbox.get(timeout=1.0)
+            except queue.Empty:
+                dead = [worker.name for worker in self._workers if not worker.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Worker process exited unexpectedly: {', '.join(dead)}")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-worker throughput counters."""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        stats = []
+        for worker_id in range(self.num_workers):
+            base = worker_id * _NUM_COUNTERS
+            processed = int(self._counters[base + _PROCESSED])
+            busy = self._counters[base + _BUSY_SECONDS]
+            stats.append({
+                "worker": worker_id,
+                "processed": processed,
+                "errors": int(self._counters[base + _ERRORS]),
+                "busy_seconds": round(busy, 3),
+                "tickets_per_sec": round(processed / elapsed, 2) if elapsed else 0.0,
+                "utilization": round(busy / elapsed, 3) if elapsed else 0.0,
+            })
+        return stats
@@ -0,0 +1,148 @@
+"""
+Round trips through the remote transports against a real `python -m src.mcp_server`
+subprocess, compared with calling the same abilities in-process.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src.mcp_client import MCPClient
+from src.transports import HttpTransport, MCPError, StdioTransport, TransportError
+
+SERVER = [sys.executable, "-m", "src.mcp_server", "--server", "ATLAS"]
+
+TICKETS = [
+    {"ticket_id": "101", "customer_name": "Ann Lee", "email": "ann@example.com", "priority": "high",
+     "query": "I can't log in to my account ACCT12345, the page shows error 500. Please help urgently."},
+    {"ticket_id": "102", "customer_name": "Bo Chen", "email": "bo@example.com", "priority": "low",
+     "query": "I was charged twice for my subscription on invoice INV-2024-001, can I get a refund?"},
+    {"ticket_id": "103", "customer_name": "Cy Diaz", "email": "cy@example.com", "priority": "medium",
+     "query": "How do I reset my password? The reset email never arrives."},
+]
+
+ABILITIES = ["extract_entities", "enrich_records", "knowledge_base_search", "escalation_decision"]
+
+# A stand-in server that answers `count` with how many times each tool was called
+# and never answers `slow` or `slow_idempotent`, to exercise timeouts and retries.
+FAKE_SERVER = r'''
+import collections, json, sys
+calls = collections.Counter()
+for line in sys.stdin:
+    message = json.loads(line)
+    if "id" not in message:
+        continue
+    if message["method"] == "initialize":
+        result = {}
+    else:
+        name = message["params"]["name"]
+        calls[name] += 1
+        if name.startswith("slow"):
+            continue
+        result = {"structuredContent": dict(calls)}
+    print(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}), flush=True)
+'''
+
+
+def _in_process(ability_name, state):
+    result = MCPClient().atlas_abilities[ability_name](state)
+    # Compare with what survives the JSON round trip to the server
+    return json.loads(json.dumps(result, default=str))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def http_url():
+    port = _free_port()
+    process = subprocess.Popen(SERVER + ["--http", str(port)], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                pytest.fail("MCP HTTP server did not start")
+            time.sleep(0.1)
+    yield f"http://127.0.0.1:{port}/mcp"
+    process.terminate()
+    process.wait()
+
+
+@pytest.fixture(params=["stdio", "http"])
+def transport(request):
+    if request.param == "stdio":
+        transport = StdioTransport(SERVER + ["--stdio"], timeout=30)
+    else:
+        transport = HttpTransport(request.getfixturevalue("http_url"), timeout=30)
+    yield transport
+    transport.close()
+
+
+@pytest.mark.parametrize("ability_name", ABILITIES)
+def test_call_matches_in_process(transport, ability_name):
+    for ticket in TICKETS:
+        assert transport.call(ability_name, ticket) == _in_process(ability_name, ticket)
+
+
+def test_call_many_keeps_order(transport):
+    calls = [(ability_name, ticket) for ticket in TICKETS for ability_name in ABILITIES]
+    assert transport.call_many(calls) == [_in_process(name, state) for name, state in calls]
+
+
+def test_call_many_returns_each_calls_error(transport):
+    calls = [("extract_entities", TICKETS[0]), ("no_such_ability", TICKETS[0]), ("extract_entities", TICKETS[1])]
+    with pytest.raises(MCPError):
+        transport.call_many(calls)
+    first, missing, last = transport.call_many(calls, return_exceptions=True)
+    assert first == _in_process("extract_entities", TICKETS[0])
+    assert isinstance(missing, MCPError)
+    assert last == _in_process("extract_entities", TICKETS[1])
+
+
+def test_stdio_multiplexes_concurrent_callers():
+    transport = StdioTransport(SERVER + ["--stdio"], timeout=30)
+    calls = [(ability_name, ticket) for ticket in TICKETS for ability_name in ABILITIES] * 4
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda call: transport.call(*call), calls))
+        assert results == [_in_process(name, state) for name, state in calls]
+        assert transport._pending == {}
+    finally:
+        transport.close()
+
+
+def test_stdio_timeout():
+    transport = StdioTransport([sys.executable, "-c", FAKE_SERVER], timeout=0.3, retries=0)
+    try:
+        started = time.monotonic()
+        with pytest.raises(TransportError):
+            transport.call("slow", {})
+        assert 0.3 <= time.monotonic() - started < 2.0
+        assert transport._pending == {}
+    finally:
+        transport.close()
+
+
+def test_only_idempotent_abilities_are_resent_after_timeout():
+    transport = StdioTransport([sys.executable, "-c", FAKE_SERVER], timeout=0.3, retries=2, backoff=0.01,
+                               idempotent=["slow_idempotent"])
+    try:
+        for name in ("slow", "slow_idempotent"):
+            with pytest.raises(TransportError):
+                transport.call(name, {})
+        calls = transport.call("count", {})
+        assert calls["slow"] == 1
+        assert calls["slow_idempotent"] == 3
+    finally:
+        transport.close()